@@ -0,0 +1,160 @@
+"""Adaptive quiz assembly driven by weak areas.
+
+Every candidate topic of a student gets a priority from its ``WeakArea``
+severity and from how long ago the student last practised it, in the style
+of spaced repetition: the weaker the topic, the shorter its review interval.
+A max-heap per student hands out question slots one at a time; a topic that
+was just picked goes back on the heap at a decayed priority, so severe topics
+recur while the rest of the quiz still spreads out.
+
+Building quizzes for a cohort is one batch: weak areas and last-practice times
+for all students are read with a couple of grouped queries and every quiz is
+written with two executemany inserts in a single commit.
+"""
+
+import heapq
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+
+from .models import Quiz, QuizAttempt, QuizQuestion, QuizResponse, Role, SyllabusItem, User, WeakArea
+from .quiz import question_fields
+
+SEVERITY_FLOOR = 0.1  # topics without a weak area still come up
+MAX_INTERVAL_DAYS = 14.0  # review interval at severity 0; severity 1 is due after a day
+MAX_OVERDUE = 2.0
+REPEAT_DECAY = 0.35
+FALLBACK_TOPIC = "general principle"
+ID_CHUNK = 500
+
+
+@dataclass
+class TopicState:
+    topic: str
+    severity: float = 0.0
+    last_practiced: datetime | None = None
+
+    def priority(self, now: datetime) -> float:
+        if self.last_practiced is None:
+            due = MAX_OVERDUE
+        else:
+            interval = MAX_INTERVAL_DAYS ** (1 - self.severity)
+            elapsed = (now - self.last_practiced).total_seconds() / 86400
+            due = min(MAX_OVERDUE, max(0.0, elapsed) / interval)
+        return (SEVERITY_FLOOR + self.severity) * (SEVERITY_FLOOR + due)
+
+
+def schedule_topics(states: list[TopicState], num_questions: int, now: datetime, rng: random.Random) -> list[str]:
+    """Pick a topic for each question slot, highest priority first."""
+    # heapq is a min-heap, so priorities are negated; the random key breaks ties.
+    heap = [(-state.priority(now), rng.random(), state.topic) for state in states]
+    heapq.heapify(heap)
+    picked: list[str] = []
+    while heap and len(picked) < num_questions:
+        neg_priority, tie, topic = heapq.heappop(heap)
+        picked.append(topic)
+        heapq.heappush(heap, (neg_priority * REPEAT_DECAY, tie, topic))
+    return picked
+
+
+def class_students(session: Session, class_id: str) -> list[int]:
+    students = session.exec(select(User.id, User.classes).where(User.role == Role.student, User.active.is_(True))).all()
+    return [student_id for student_id, classes in students if class_id in (classes or [])]
+
+
+def syllabus_topics(session: Session, class_id: str, subject: str) -> list[str]:
+    rows = session.exec(
+        select(SyllabusItem.topic).where(SyllabusItem.class_id == class_id, SyllabusItem.subject == subject).distinct()
+    ).all()
+    return sorted(rows)
+
+
+def load_topic_states(session: Session, student_ids: list[int], topics: list[str]) -> dict[int, dict[str, TopicState]]:
+    """Topic state for each student: the requested topics plus (when none are given) their weak areas."""
+    states = {student_id: {topic: TopicState(topic) for topic in topics} for student_id in student_ids}
+    for start in range(0, len(student_ids), ID_CHUNK):
+        chunk = student_ids[start : start + ID_CHUNK]
+        weak_areas = session.exec(
+            select(WeakArea.student_id, WeakArea.topic, WeakArea.severity).where(WeakArea.student_id.in_(chunk))
+        ).all()
+        for student_id, topic, severity in weak_areas:
+            if topics and topic not in topics:
+                continue
+            state = states[student_id].setdefault(topic, TopicState(topic))
+            state.severity = max(state.severity, min(1.0, severity))
+
+        practiced = session.exec(
+            select(QuizAttempt.student_id, QuizQuestion.topic, func.max(QuizAttempt.submitted_at))
+            .join(QuizResponse, QuizResponse.attempt_id == QuizAttempt.id)
+            .join(QuizQuestion, QuizQuestion.id == QuizResponse.question_id)
+            .where(QuizAttempt.student_id.in_(chunk), QuizAttempt.submitted_at.is_not(None))
+            .group_by(QuizAttempt.student_id, QuizQuestion.topic)
+        ).all()
+        for student_id, topic, last_practiced in practiced:
+            state = states[student_id].get(topic or "general")
+            if state and (state.last_practiced is None or last_practiced > state.last_practiced):
+                state.last_practiced = last_practiced
+    return states
+
+
+def create_adaptive_quizzes(
+    session: Session,
+    class_id: str,
+    subject: str,
+    topics: list[str],
+    num_questions: int,
+    student_ids: list[int] | None = None,
+    rng: random.Random | None = None,
+) -> list[dict[str, Any]]:
+    """Create one personalised quiz per student in a single transaction.
+
+    Without explicit ``topics`` the class syllabus for ``subject`` is the topic
+    pool, falling back to each student's weak areas when there is none.
+    """
+    rng = rng or random.Random()
+    topics = topics or syllabus_topics(session, class_id, subject)
+    # Students may have left the class since a queued request was checked; only current members get a quiz.
+    members = class_students(session, class_id)
+    if student_ids is None:
+        student_ids = members
+    else:
+        allowed = set(members)
+        student_ids = [student_id for student_id in dict.fromkeys(student_ids) if student_id in allowed]
+    now = datetime.utcnow()
+    states = load_topic_states(session, student_ids, topics)
+
+    plans: list[tuple[int, list[str]]] = []
+    for student_id in student_ids:
+        candidates = list(states[student_id].values()) or [TopicState(FALLBACK_TOPIC)]
+        plans.append((student_id, schedule_topics(candidates, num_questions, now, rng)))
+    if not plans:
+        return []
+
+    # Core executemany inserts: building ORM objects dominates at cohort sizes.
+    quiz_ids = session.execute(
+        insert(Quiz.__table__).returning(Quiz.__table__.c.id, sort_by_parameter_order=True),
+        [
+            {
+                "class_id": class_id,
+                "subject": subject,
+                "generated_from": {"topics": sorted(set(scheduled)), "adaptive": True, "student_id": student_id},
+                "owner_id": student_id,
+                "created_at": now,
+            }
+            for student_id, scheduled in plans
+        ],
+    ).scalars().all()
+    question_rows = [
+        {"quiz_id": quiz_id, **question_fields(topic)}
+        for quiz_id, (_, scheduled) in zip(quiz_ids, plans)
+        for topic in scheduled
+    ]
+    # An empty executemany would become a single INSERT ... DEFAULT VALUES.
+    if question_rows:
+        session.execute(insert(QuizQuestion.__table__), question_rows)
+    session.commit()
+    return [{"student_id": student_id, "quiz_id": quiz_id, "topics": scheduled} for quiz_id, (student_id, scheduled) in zip(quiz_ids, plans)]
@@ -0,0 +1,291 @@
+"""Admission control: token-bucket rate limits and priority-aware load shedding.
+
+Every HTTP request is matched to a :class:`Rule`. A rule can carry a bucket
+per client (the bearer token's user, or the peer address when anonymous;
+login adds the submitted username, so one school behind a NAT isn't a single
+client) and a bucket shared by everyone hitting the route; running out of
+either yields ``429`` with ``Retry-After``. Independently, requests in flight are counted
+and, past a priority-dependent share of ``max_in_flight``, new requests are
+shed with ``503`` so quiz submissions keep flowing while chat/AI traffic is
+turned away first.
+
+Buckets live in a :class:`BucketStore`. The default keeps them in process;
+several API workers need a shared implementation (e.g. Redis) passed to
+:class:`AdmissionController`.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Protocol
+from urllib.parse import parse_qs
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import Settings, get_settings
+from .security import decode_token
+
+LOW, NORMAL, HIGH = 0, 1, 2
+PRIORITY_NAMES = {LOW: "low", NORMAL: "normal", HIGH: "high"}
+# Share of max_in_flight each priority may occupy before it is shed.
+SHED_THRESHOLDS = {LOW: 0.5, NORMAL: 0.85, HIGH: 1.0}
+
+
+class BucketStore(Protocol):
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        """Consume ``cost`` tokens; return 0 when allowed, else seconds until enough tokens exist."""
+        ...
+
+    async def refund(self, key: str, rate: float, burst: int, cost: float = 1.0) -> None:
+        """Give back tokens taken for a request that was refused by another bucket."""
+        ...
+
+
+class MemoryBucketStore:
+    """Token buckets in a dict; idle buckets (already refilled) are pruned as the map grows."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float, float]] = {}  # key -> (tokens, updated, full_after)
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (float(burst), now, now))
+            tokens = min(float(burst), tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return wait
+
+    async def refund(self, key: str, rate: float, burst: int, cost: float = 1.0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._buckets:
+                return
+            tokens, updated, _ = self._buckets[key]
+            tokens = min(float(burst), tokens + (now - updated) * rate + cost)
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+
+    def _prune(self, now: float) -> None:
+        # A bucket that would be full again is indistinguishable from a new one.
+        self._buckets = {key: entry for key, entry in self._buckets.items() if entry[2] > now}
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    pattern: re.Pattern[str]
+    methods: frozenset[str] | None = None
+    priority: int = NORMAL
+    per_client: tuple[float, int] | None = None  # (tokens per second, burst)
+    per_route: tuple[float, int] | None = None
+    key_field: str | None = None  # urlencoded form field added to the client key
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and self.pattern.match(path) is not None
+
+
+def default_rules(settings: Settings) -> list[Rule]:
+    prefix = re.escape(settings.api_prefix)
+    return [
+        Rule("health", re.compile(r"/health$"), priority=HIGH),
+        Rule(
+            "quiz_attempt",
+            re.compile(rf"{prefix}/quizzes/\d+/attempts$"),
+            frozenset({"POST"}),
+            priority=HIGH,
+            per_client=(settings.rate_limit_per_second, settings.rate_limit_burst),
+        ),
+        Rule(
+            "login",
+            re.compile(rf"{prefix}/auth/login$"),
+            frozenset({"POST"}),
+            per_client=(settings.login_rate_per_minute / 60, settings.login_burst),
+            key_field="username",
+            # Caps total bcrypt work no matter how many addresses or usernames are used.
+            per_route=(settings.login_route_per_second, max(1, int(settings.login_route_per_second * 2))),
+        ),
+        Rule(
+            "chat_ai",
+            re.compile(rf"{prefix}/chat/ai$"),
+            frozenset({"POST"}),
+            priority=LOW,
+            per_client=(settings.ai_rate_per_minute / 60, settings.ai_burst),
+            per_route=(settings.ai_route_per_second, max(1, int(settings.ai_route_per_second * 2))),
+        ),
+        Rule(
+            "chat",
+            re.compile(rf"{prefix}/chat/"),
+            priority=LOW,
+            per_client=(settings.rate_limit_per_second, settings.rate_limit_burst),
+        ),
+        Rule("default", re.compile(r"/"), per_client=(settings.rate_limit_per_second, settings.rate_limit_burst)),
+    ]
+
+
+class AdmissionMetrics:
+    def __init__(self) -> None:
+        self.counts: Counter[tuple[str, str]] = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def record(self, rule: str, outcome: str) -> None:
+        self.counts[(rule, outcome)] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        rules: dict[str, dict[str, int]] = {}
+        for (rule, outcome), count in self.counts.items():
+            rules.setdefault(rule, {"admitted": 0, "rate_limited": 0, "shed": 0})[outcome] = count
+        return {"in_flight": self.in_flight, "peak_in_flight": self.peak_in_flight, "rules": rules}
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        rules: list[Rule],
+        store: BucketStore | None = None,
+        max_in_flight: int = 200,
+        enabled: bool = True,
+    ) -> None:
+        self.rules = rules
+        self.store = store or MemoryBucketStore()
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self.metrics = AdmissionMetrics()
+
+    def match(self, method: str, path: str) -> Rule | None:
+        return next((rule for rule in self.rules if rule.matches(method, path)), None)
+
+    def shed(self, rule: Rule) -> bool:
+        return self.metrics.in_flight >= self.max_in_flight * SHED_THRESHOLDS[rule.priority]
+
+    async def wait_time(self, rule: Rule, client: str) -> float:
+        """Seconds the caller has to wait, or 0 when both buckets had a token."""
+        # Client first: a client over its own limit must not drain the shared route bucket.
+        client_key = f"client:{rule.name}:{client}"
+        if rule.per_client:
+            wait = await self.store.take(client_key, *rule.per_client)
+            if wait:
+                return wait
+        if rule.per_route:
+            wait = await self.store.take(f"route:{rule.name}", *rule.per_route)
+            if wait:
+                if rule.per_client:
+                    await self.store.refund(client_key, *rule.per_client)
+                return wait
+        return 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"enabled": self.enabled, "max_in_flight": self.max_in_flight, **self.metrics.snapshot()}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI so admitted responses (including streams) pass through untouched."""
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController") -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = self.controller
+        if scope["type"] != "http" or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        rule = controller.match(scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        if controller.shed(rule):
+            controller.metrics.record(rule.name, "shed")
+            await _reject(send, 503, "Server busy, retry shortly", 1.0)
+            return
+        client = _client_key(scope)
+        if rule.key_field:
+            value, receive = await _form_field(scope, receive, rule.key_field)
+            if value:
+                client += f":{rule.key_field}:{value.lower()}"
+        wait = await controller.wait_time(rule, client)
+        if wait:
+            controller.metrics.record(rule.name, "rate_limited")
+            await _reject(send, 429, "Too many requests", wait)
+            return
+
+        controller.metrics.record(rule.name, "admitted")
+        metrics = controller.metrics
+        metrics.in_flight += 1
+        metrics.peak_in_flight = max(metrics.peak_in_flight, metrics.in_flight)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.in_flight -= 1
+
+
+def _client_key(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            try:
+                return f"user:{decode_token(value[7:].decode()).user_id}"
+            except Exception:
+                break
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _form_field(scope: Scope, receive: Receive, field: str, max_bytes: int = 16_384) -> tuple[str | None, Receive]:
+    """Read one field of an urlencoded request body, returning a ``receive`` that replays what was consumed."""
+    content_type = next((value for name, value in scope["headers"] if name == b"content-type"), b"")
+    if not content_type.startswith(b"application/x-www-form-urlencoded"):
+        return None, receive
+    consumed: list[dict[str, Any]] = []
+    body = b""
+    while len(body) <= max_bytes:
+        message = await receive()
+        consumed.append(message)
+        if message["type"] != "http.request":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    async def replay() -> dict[str, Any]:
+        return consumed.pop(0) if consumed else await receive()
+
+    if len(body) > max_bytes:
+        return None, replay
+    values = parse_qs(body.decode("latin-1")).get(field)
+    return (values[0] if values else None), replay
+
+
+async def _reject(send: Send, status_code: int, detail: str, retry_after: float) -> None:
+    body = orjson.dumps({"detail": detail})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def build_controller(settings: Settings) -> AdmissionController:
+    return AdmissionController(default_rules(settings), max_in_flight=settings.max_in_flight, enabled=settings.rate_limit_enabled)
+
+
+admission = build_controller(get_settings())
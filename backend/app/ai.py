@@ -1,32 +1,261 @@
+"""AI providers behind ``ask_ai``.
+
+Each task type (``chat``, ``quiz``) is routed to a named provider:
+
+- ``stub``: deterministic canned replies, used when nothing else is configured.
+- ``openai``: ``api.openai.com`` chat completions, one request per prompt.
+- ``local``: an OpenAI-compatible server (llama.cpp, vLLM, ...) at
+  ``AI_LOCAL_URL``. Prompts are sent together as one ``/completions``
+  request with a list ``prompt``, which such servers evaluate as a batch.
+
+Every provider sits behind a :class:`MicroBatcher`: prompts arriving within
+``AI_BATCH_WINDOW_MS`` of each other (up to the provider's batch size) are
+handed to the provider in a single call, and at most
+``AI_MAX_CONCURRENT_BATCHES`` calls per provider are in flight. Tasks routed
+to the same provider share its batches.
+"""
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Protocol
+
 import httpx
 
-from .config import get_settings
+from .config import Settings, get_settings
 
 settings = get_settings()
 
+SYSTEM_PROMPT = "You are a concise educational assistant."
+TASK_PROMPTS = {
+    "chat": SYSTEM_PROMPT,
+    "quiz": SYSTEM_PROMPT + " Write clear, unambiguous quiz material for students.",
+}
+
+
+@dataclass(frozen=True)
+class Prompt:
+    message: str
+    syllabus_context: tuple[str, ...] = ()
+    task: str = "chat"
+
+    def system(self) -> str:
+        system = TASK_PROMPTS.get(self.task, SYSTEM_PROMPT)
+        if self.syllabus_context:
+            system += " Syllabus context: " + " | ".join(self.syllabus_context)
+        return system
+
+
+class Provider(Protocol):
+    name: str
+    max_batch: int
+
+    async def complete(self, prompts: list[Prompt]) -> list[str | BaseException]:
+        """One reply per prompt, in order. An exception in a prompt's place fails that prompt; raising fails the batch."""
+        ...
+
+
+class StubProvider:
+    name = "stub"
+    max_batch = 1  # nothing to amortise; don't hold replies for the batch window
+
+    async def complete(self, prompts: list[Prompt]) -> list[str]:
+        replies = []
+        for prompt in prompts:
+            context = " | ".join(prompt.syllabus_context)
+            replies.append("[AI stub] " + (f"Context: {context}. " if context else "") + f"Answering briefly: {prompt.message[:300]}")
+        return replies
+
+
+class OpenAIProvider:
+    """Chat completions API; it takes one conversation per request, so a batch becomes concurrent requests."""
+
+    name = "openai"
+    max_batch = 8
+
+    def __init__(self, api_key: str, model: str, base_url: str = "https://api.openai.com/v1", timeout: float = 15.0) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    async def complete(self, prompts: list[Prompt]) -> list[str | BaseException]:
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+
+            async def one(prompt: Prompt) -> str:
+                payload = {
+                    "model": self.model,
+                    "messages": [{"role": "system", "content": prompt.system()}, {"role": "user", "content": prompt.message}],
+                }
+                resp = await client.post(f"{self.base_url}/chat/completions", headers=headers, json=payload)
+                resp.raise_for_status()
+                return resp.json()["choices"][0]["message"]["content"].strip()
+
+            # Separate requests fail separately: one rejected prompt must not fail the rest of the batch.
+            return list(await asyncio.gather(*(one(prompt) for prompt in prompts), return_exceptions=True))
+
+
+class LocalProvider:
+    """OpenAI-compatible local server; a batch is one ``/completions`` call with a list of prompts."""
+
+    name = "local"
 
-async def ask_ai(message: str, syllabus_context: list[str] | None = None) -> tuple[str, str]:
-    """Return AI reply and provider name. Fallback to deterministic stub when no API key."""
-    if not settings.openai_api_key:
-        context = " | ".join(syllabus_context or [])
-        reply = (
-            "[AI stub] "
-            + (f"Context: {context}. " if context else "")
-            + f"Answering briefly: {message[:300]}"
+    def __init__(self, base_url: str, model: str, max_batch: int = 16, max_tokens: int = 256, api_key: str | None = None, timeout: float = 60.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.max_batch = max_batch
+        self.max_tokens = max_tokens
+        self.api_key = api_key
+        self.timeout = timeout
+
+    @staticmethod
+    def render(prompt: Prompt) -> str:
+        return f"System: {prompt.system()}\nUser: {prompt.message}\nAssistant:"
+
+    async def complete(self, prompts: list[Prompt]) -> list[str]:
+        headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        payload = {"model": self.model, "prompt": [self.render(prompt) for prompt in prompts], "max_tokens": self.max_tokens}
+        async with httpx.AsyncClient(timeout=self.timeout) as client:
+            resp = await client.post(f"{self.base_url}/completions", headers=headers, json=payload)
+            resp.raise_for_status()
+            choices = resp.json()["choices"]
+        if len(choices) != len(prompts):
+            raise ValueError(f"{self.name} returned {len(choices)} choices for {len(prompts)} prompts")
+        by_index = {choice.get("index", n): choice["text"].strip() for n, choice in enumerate(choices)}
+        return [by_index[n] for n in range(len(prompts))]
+
+
+class MicroBatcher:
+    """Collects prompts for one provider and flushes them as batched ``complete`` calls."""
+
+    def __init__(self, provider: Provider, window_ms: float, max_batch: int | None = None, max_concurrent: int = 2) -> None:
+        self.provider = provider
+        self.window_s = window_ms / 1000
+        self.max_batch = max(1, min(max_batch or provider.max_batch, provider.max_batch))
+        self.max_concurrent = max_concurrent
+        self.stats: Counter[str] = Counter()
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind(self) -> asyncio.AbstractEventLoop:
+        # Futures, timers and the semaphore belong to one event loop; tests and the bench start several.
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending: list[tuple[Prompt, asyncio.Future[str]]] = []
+            self._timer: asyncio.TimerHandle | None = None
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+            self._tasks: set[asyncio.Task] = set()
+        return loop
+
+    async def submit(self, prompt: Prompt) -> str:
+        loop = self._bind()
+        future: asyncio.Future[str] = loop.create_future()
+        self._pending.append((prompt, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+        if self._pending:
+            self._timer = self._loop.call_later(self.window_s, self._flush)
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[Prompt, asyncio.Future[str]]]) -> None:
+        async with self._slots:
+            # Prompts that queued while every slot was busy ride along instead of waiting another window.
+            room = self.max_batch - len(batch)
+            if room > 0 and self._pending:
+                batch, self._pending = batch + self._pending[:room], self._pending[room:]
+                if not self._pending and self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            self.stats["batches"] += 1
+            self.stats["prompts"] += len(batch)
+            try:
+                replies = await self.provider.complete([prompt for prompt, _ in batch])
+            except Exception as exc:
+                self.stats["failed_batches"] += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+        for (_, future), reply in zip(batch, replies):
+            if future.done():
+                continue
+            if isinstance(reply, BaseException):
+                self.stats["failed_prompts"] += 1
+                future.set_exception(reply)
+            else:
+                future.set_result(reply)
+
+    def snapshot(self) -> dict[str, Any]:
+        batches = self.stats["batches"]
+        return {
+            "max_batch": self.max_batch,
+            **self.stats,
+            "mean_batch_size": round(self.stats["prompts"] / batches, 2) if batches else None,
+        }
+
+
+class AIRouter:
+    def __init__(self, batchers: dict[str, MicroBatcher], routes: dict[str, str]) -> None:
+        self.batchers = batchers
+        self.routes = routes
+
+    def batcher_for(self, task: str) -> MicroBatcher:
+        return self.batchers[self.routes.get(task) or self.routes["chat"]]
+
+    async def ask(self, prompt: Prompt) -> tuple[str, str]:
+        batcher = self.batcher_for(prompt.task)
+        return await batcher.submit(prompt), batcher.provider.name
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"routes": dict(self.routes), "providers": {name: batcher.snapshot() for name, batcher in self.batchers.items()}}
+
+
+def build_providers(settings: Settings) -> list[Provider]:
+    providers: list[Provider] = [StubProvider()]
+    if settings.openai_api_key:
+        providers.append(OpenAIProvider(settings.openai_api_key, settings.ai_model))
+    if settings.ai_local_url:
+        providers.append(
+            LocalProvider(
+                settings.ai_local_url,
+                settings.ai_local_model,
+                max_batch=settings.ai_max_batch,
+                max_tokens=settings.ai_max_tokens,
+                api_key=settings.ai_local_api_key,
+            )
         )
-        return reply, "stub"
-
-    headers = {"Authorization": f"Bearer {settings.openai_api_key}"}
-    payload = {
-        "model": settings.ai_model,
-        "messages": [
-            {"role": "system", "content": "You are a concise educational assistant."},
-            {"role": "user", "content": message},
-        ],
+    return providers
+
+
+def build_router(settings: Settings) -> AIRouter:
+    batchers = {
+        provider.name: MicroBatcher(provider, settings.ai_batch_window_ms, settings.ai_max_batch, settings.ai_max_concurrent_batches)
+        for provider in build_providers(settings)
     }
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.post("https://api.openai.com/v1/chat/completions", headers=headers, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
-        reply = data["choices"][0]["message"]["content"].strip()
-        return reply, "openai"
+    default = "openai" if "openai" in batchers else "stub"
+    routes = {"chat": settings.ai_chat_provider or default, "quiz": settings.ai_quiz_provider or settings.ai_chat_provider or default}
+    for task, name in routes.items():
+        if name not in batchers:
+            raise ValueError(f"AI provider '{name}' for task '{task}' is not configured")
+    return AIRouter(batchers, routes)
+
+
+ai_router = build_router(settings)
+
+
+async def ask_ai(message: str, syllabus_context: list[str] | None = None, task: str = "chat") -> tuple[str, str]:
+    """Return AI reply and provider name."""
+    return await ai_router.ask(Prompt(message, tuple(syllabus_context or ()), task))
@@ -4,10 +4,15 @@ from typing import List
 from sqlalchemy import delete
 from sqlmodel import Session, select
 
+from .archive import archived_responses
 from .models import QuizAttempt, QuizQuestion, QuizResponse, WeakArea
 
 
 def compute_weak_areas(session: Session, student_id: int) -> List[WeakArea]:
+    """Recompute and store a student's weak areas from all their responses, archived ones included.
+
+    The stored rows feed adaptive scheduling, so they always reflect the full history.
+    """
     attempts = session.exec(select(QuizAttempt).where(QuizAttempt.student_id == student_id)).all()
     if not attempts:
         return []
@@ -15,14 +20,18 @@ def compute_weak_areas(session: Session, student_id: int) -> List[WeakArea]:
     topic_errors: Counter[str] = Counter()
     evidence_map: defaultdict[str, list[int]] = defaultdict(list)
 
+    answers: list[tuple[int, bool]] = []
     for attempt in attempts:
         responses = session.exec(select(QuizResponse).where(QuizResponse.attempt_id == attempt.id)).all()
-        for resp in responses:
-            question = session.get(QuizQuestion, resp.question_id)
-            topic = question.topic or "general"
-            if not resp.correct:
-                topic_errors[topic] += 1
-                evidence_map[topic].append(question.id)
+        answers.extend((resp.question_id, resp.correct) for resp in responses)
+    answers.extend((row["question_id"], row["correct"]) for row in archived_responses(session, student_id))
+
+    for question_id, correct in answers:
+        question = session.get(QuizQuestion, question_id)
+        topic = question.topic or "general"
+        if not correct:
+            topic_errors[topic] += 1
+            evidence_map[topic].append(question.id)
 
     # Clear previous computed weak areas for simplicity
     session.exec(delete(WeakArea).where(WeakArea.student_id == student_id))
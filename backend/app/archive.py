@@ -0,0 +1,206 @@
+"""Hot/cold archival of chat messages and quiz responses.
+
+Rows older than the retention window are moved out of their table into
+gzip-compressed JSON Lines files under ``ARCHIVE_DIR``, partitioned by kind
+and month (``chat_message/2024-01/<token>.jsonl.gz``). Each file is recorded
+as an :class:`ArchiveSegment`, and the thread or student ids it holds as
+:class:`ArchiveSegmentKey` rows, so readers that ask for archived data find
+the files that can match with an index lookup and open only those.
+
+Only the readers below see archived rows: chat history on request and
+weak-area recomputes always. Item analysis, the gradebook export and the
+practice times behind adaptive scheduling read the hot tables alone.
+
+A run works in batches: the files of a batch are written first, then the
+segment rows are inserted and the hot rows deleted in one transaction. A
+crash in between leaves at most an unreferenced file, never lost rows.
+"""
+
+import gzip
+import os
+import secrets
+from collections import defaultdict
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+
+from .config import get_settings
+from .item_analysis import item_analysis_cache
+from .models import ArchiveSegment, ArchiveSegmentKey, ChatMessage, QuizAttempt, QuizResponse
+
+settings = get_settings()
+
+CHAT_MESSAGE = "chat_message"
+QUIZ_RESPONSE = "quiz_response"
+ID_CHUNK = 500
+
+
+def _write_segment(kind: str, month: str, rows: list[dict[str, Any]]) -> str:
+    relative = os.path.join(kind, month, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{secrets.token_hex(4)}.jsonl.gz")
+    path = os.path.join(settings.archive_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path + ".tmp", "wb") as fh:
+        for row in rows:
+            fh.write(orjson.dumps(row) + b"\n")
+    os.replace(path + ".tmp", path)
+    return relative
+
+
+@lru_cache(maxsize=16)
+def _read_segment(relative: str) -> tuple[dict[str, Any], ...]:
+    # Segments are immutable once written, so parsed contents can be cached.
+    with gzip.open(os.path.join(settings.archive_dir, relative), "rb") as fh:
+        return tuple(orjson.loads(line) for line in fh if line.strip())
+
+
+def _segments_for(session: Session, kind: str, key: int, before_id: int | None = None) -> list[ArchiveSegment]:
+    query = (
+        select(ArchiveSegment)
+        .join(ArchiveSegmentKey, ArchiveSegmentKey.segment_id == ArchiveSegment.id)
+        .where(ArchiveSegmentKey.key == key, ArchiveSegment.kind == kind)
+        .order_by(ArchiveSegment.max_id.desc())
+    )
+    if before_id is not None:
+        query = query.where(ArchiveSegment.min_id < before_id)
+    return session.exec(query).all()
+
+
+def _store_batch(session: Session, kind: str, rows: list[tuple[str, int, dict[str, Any]]], model) -> int:
+    """Write (month, key, row) tuples to one segment per month, then swap them out of ``model``'s table."""
+    by_month: defaultdict[str, list[tuple[int, dict[str, Any]]]] = defaultdict(list)
+    for month, key, row in rows:
+        by_month[month].append((key, row))
+    key_rows: list[dict[str, int]] = []
+    for month, entries in sorted(by_month.items()):
+        ids = [row["id"] for _, row in entries]
+        segment = ArchiveSegment(
+            kind=kind,
+            month=month,
+            path=_write_segment(kind, month, [row for _, row in entries]),
+            rows=len(entries),
+            min_id=min(ids),
+            max_id=max(ids),
+        )
+        session.add(segment)
+        session.flush()
+        key_rows.extend({"segment_id": segment.id, "key": key} for key in sorted({key for key, _ in entries}))
+    session.execute(insert(ArchiveSegmentKey.__table__), key_rows)
+    ids = [row["id"] for _, _, row in rows]
+    for start in range(0, len(ids), ID_CHUNK):
+        session.exec(delete(model).where(model.id.in_(ids[start : start + ID_CHUNK])))
+    session.commit()
+    return len(ids)
+
+
+def archive_chat_messages(session: Session, cutoff: datetime, batch_size: int | None = None) -> int:
+    batch_size = batch_size or settings.archive_batch_size
+    moved = 0
+    while True:
+        messages = session.exec(
+            select(ChatMessage.id, ChatMessage.thread_id, ChatMessage.sender_id, ChatMessage.role, ChatMessage.body, ChatMessage.created_at)
+            .where(ChatMessage.created_at < cutoff)
+            .order_by(ChatMessage.id)
+            .limit(batch_size)
+        ).all()
+        if not messages:
+            return moved
+        rows = [
+            (
+                f"{created_at:%Y-%m}",
+                thread_id,
+                {"id": id_, "thread_id": thread_id, "sender_id": sender_id, "role": role.value, "body": body, "created_at": created_at},
+            )
+            for id_, thread_id, sender_id, role, body, created_at in messages
+        ]
+        moved += _store_batch(session, CHAT_MESSAGE, rows, ChatMessage)
+
+
+def archive_quiz_responses(session: Session, cutoff: datetime, batch_size: int | None = None) -> int:
+    """Archive responses of attempts submitted before ``cutoff``; attempts (and scores) stay hot."""
+    batch_size = batch_size or settings.archive_batch_size
+    moved = 0
+    while True:
+        responses = session.exec(
+            select(
+                QuizResponse.id,
+                QuizResponse.attempt_id,
+                QuizResponse.question_id,
+                QuizResponse.choice,
+                QuizResponse.correct,
+                QuizResponse.feedback,
+                QuizAttempt.student_id,
+                QuizAttempt.quiz_id,
+                QuizAttempt.submitted_at,
+            )
+            .join(QuizAttempt, QuizAttempt.id == QuizResponse.attempt_id)
+            .where(QuizAttempt.submitted_at < cutoff)
+            .order_by(QuizResponse.id)
+            .limit(batch_size)
+        ).all()
+        if not responses:
+            return moved
+        rows = [
+            (
+                f"{submitted_at:%Y-%m}",
+                student_id,
+                {
+                    "id": id_,
+                    "attempt_id": attempt_id,
+                    "question_id": question_id,
+                    "choice": choice,
+                    "correct": correct,
+                    "feedback": feedback,
+                    "student_id": student_id,
+                    "quiz_id": quiz_id,
+                    "submitted_at": submitted_at,
+                },
+            )
+            for id_, attempt_id, question_id, choice, correct, feedback, student_id, quiz_id, submitted_at in responses
+        ]
+        moved += _store_batch(session, QUIZ_RESPONSE, rows, QuizResponse)
+
+
+def run_archival(session: Session, now: datetime | None = None) -> dict[str, Any]:
+    now = now or datetime.utcnow()
+    result = {
+        "chat_messages": archive_chat_messages(session, now - timedelta(days=settings.chat_retention_days)),
+        "quiz_responses": archive_quiz_responses(session, now - timedelta(days=settings.quiz_response_retention_days)),
+    }
+    if result["quiz_responses"]:
+        # Cached statistics were keyed on attempts, which archival leaves in place.
+        item_analysis_cache.clear()
+    return result
+
+
+def archived_messages(session: Session, thread_id: int, before_id: int | None = None, limit: int = 50) -> list[dict[str, Any]]:
+    """Up to ``limit`` archived messages of a thread below ``before_id``, newest first."""
+    rows: list[dict[str, Any]] = []
+    # Newest segments first: once a page is full, a segment whose ids all fall below it can't contribute.
+    for segment in _segments_for(session, CHAT_MESSAGE, thread_id, before_id):
+        if len(rows) >= limit and segment.max_id < rows[-1]["id"]:
+            break
+        rows.extend(row for row in _read_segment(segment.path) if row["thread_id"] == thread_id and (before_id is None or row["id"] < before_id))
+        rows.sort(key=lambda row: row["id"], reverse=True)
+        del rows[limit:]
+    return [{**row, "created_at": datetime.fromisoformat(row["created_at"])} for row in rows]
+
+
+def archived_responses(session: Session, student_id: int) -> Iterator[dict[str, Any]]:
+    for segment in _segments_for(session, QUIZ_RESPONSE, student_id):
+        for row in _read_segment(segment.path):
+            if row["student_id"] == student_id:
+                yield row
+
+
+def archive_stats(session: Session) -> list[dict[str, Any]]:
+    rows = session.exec(
+        select(ArchiveSegment.kind, ArchiveSegment.month, func.count(ArchiveSegment.id), func.sum(ArchiveSegment.rows))
+        .group_by(ArchiveSegment.kind, ArchiveSegment.month)
+        .order_by(ArchiveSegment.kind, ArchiveSegment.month)
+    ).all()
+    return [{"kind": kind, "month": month, "segments": segments, "rows": int(total or 0)} for kind, month, segments, total in rows]
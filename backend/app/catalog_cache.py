@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from fastapi import Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from .config import get_settings
+from .db import insert_ignore
+from .deps import active_user
+from .models import CatalogVersion
+from .schemas import TokenData
+
+settings = get_settings()
+
+SYLLABUS = "syllabus"
+QUIZZES = "quizzes"
+
+ALL_CLASSES = "*"
+
+
+class CatalogCache:
+    """Per-class version counters plus a bounded cache of serialized catalog responses.
+
+    Writers call :meth:`bump` in the transaction that changes a catalog;
+    readers derive an ETag from the current version and key cached bodies by
+    ``(kind, class_id, version)``, so a bump invalidates without having to find
+    and evict entries. Counters are ``CatalogVersion`` rows shared by every
+    worker; each worker trusts its copy for ``CATALOG_VERSION_TTL_S``, which
+    bounds how long another worker's write can go unnoticed.
+    """
+
+    def __init__(self, max_entries: int = 512, version_ttl: float = 1.0) -> None:
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self._versions: dict[tuple[str, str], tuple[int, float]] = {}  # key -> (version, read at)
+        self._bodies: OrderedDict[tuple[str, str, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, session: Session, kind: str, class_id: str | None) -> int:
+        key = (kind, class_id or ALL_CLASSES)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(key)
+        if cached and now - cached[1] < self.version_ttl:
+            return cached[0]
+        version = session.exec(
+            select(CatalogVersion.version).where(CatalogVersion.kind == key[0], CatalogVersion.class_id == key[1])
+        ).first()
+        with self._lock:
+            self._versions[key] = (version or 0, now)
+        return version or 0
+
+    def bump(self, session: Session, kind: str, class_id: str) -> None:
+        """Advance the class and all-classes counters; takes effect when the caller commits."""
+        keys = [(kind, class_id), (kind, ALL_CLASSES)]
+        insert_ignore(session, CatalogVersion.__table__, [{"kind": k, "class_id": c, "version": 0} for k, c in keys])
+        session.execute(
+            update(CatalogVersion)
+            .where(CatalogVersion.kind == kind, CatalogVersion.class_id.in_([class_id, ALL_CLASSES]))
+            .values(version=CatalogVersion.version + 1)
+        )
+        with self._lock:
+            for key in keys:
+                self._versions.pop(key, None)
+
+    def etag(self, kind: str, class_id: str | None, version: int) -> str:
+        return f'W/"{kind}-{version}-{class_id or ALL_CLASSES}"'
+
+    def get(self, kind: str, class_id: str | None, version: int) -> bytes | None:
+        key = (kind, class_id or ALL_CLASSES, version)
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+            return body
+
+    def put(self, kind: str, class_id: str | None, version: int, body: bytes) -> None:
+        with self._lock:
+            self._bodies[(kind, class_id or ALL_CLASSES, version)] = body
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+            self._bodies.clear()
+
+
+catalog_cache = CatalogCache(version_ttl=settings.catalog_version_ttl_s)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/"x" and "x" are equivalent for If-None-Match.
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def catalog_response(
+    request: Request,
+    session: Session,
+    token_data: TokenData,
+    kind: str,
+    class_id: str | None,
+    load: Callable[[], bytes],
+) -> Response:
+    """Serve a class catalog with ETag revalidation and a read-through body cache.
+
+    A matching ``If-None-Match`` is answered with 304 on the token alone (no
+    body is sent); anything else checks that the user is still active first.
+    ``load`` is only called on a cache miss.
+    """
+    # Read the version before loading so a concurrent bump can only make the
+    # cached body newer than its key, never older.
+    version = catalog_cache.version(session, kind, class_id)
+    etag = catalog_cache.etag(kind, class_id, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    active_user(session, token_data)
+    body = catalog_cache.get(kind, class_id, version)
+    if body is None:
+        body = load()
+        catalog_cache.put(kind, class_id, version, body)
+    return Response(content=body, media_type=ORJSONResponse.media_type, headers=headers)
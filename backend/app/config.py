@@ -1,21 +1,60 @@
 from functools import lru_cache
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     app_name: str = "AI-Powered Learning System"
     api_prefix: str = "/api"
     db_url: str = "sqlite:///./data.db"
+    db_read_url: str | None = None
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 120
     openai_api_key: str | None = None
     ai_model: str = "gpt-4o-mini"
+    ai_local_url: str | None = None
+    ai_local_model: str = "local"
+    ai_local_api_key: str | None = None
+    ai_chat_provider: str | None = None
+    ai_quiz_provider: str | None = None
+    ai_batch_window_ms: float = 15.0
+    ai_max_batch: int = 16
+    ai_max_concurrent_batches: int = 2
+    ai_max_tokens: int = 256
     frontend_origin: str = "http://localhost:5173"
+    catalog_version_ttl_s: float = 1.0
+    job_workers: int = 2
+    job_poll_interval: float = 1.0
+    job_lease_seconds: int = 60
+    rate_limit_enabled: bool = True
+    rate_limit_per_second: float = 20.0
+    rate_limit_burst: int = 40
+    login_rate_per_minute: float = 10.0
+    login_burst: int = 5
+    login_route_per_second: float = 20.0
+    ai_rate_per_minute: float = 6.0
+    ai_burst: int = 3
+    ai_route_per_second: float = 5.0
+    max_in_flight: int = 200
+    archive_dir: str = "./archive"
+    chat_retention_days: int = 180
+    quiz_response_retention_days: int = 365
+    archive_batch_size: int = 20000
+    ws_batch_window_ms: float = 10.0
+    ws_batch_max: int = 200
+    ws_send_queue: int = 1000
+    ws_heartbeat_s: float = 20.0
+    ws_idle_timeout_s: float = 60.0
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 
 @lru_cache()
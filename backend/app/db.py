@@ -1,16 +1,93 @@
 from collections.abc import Generator
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel, create_engine
 
 from .config import get_settings
 
 settings = get_settings()
-engine = create_engine(settings.db_url, echo=False, connect_args={"check_same_thread": False} if settings.db_url.startswith("sqlite") else {})
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _record, read_only: bool) -> None:
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer commits; NORMAL sync is durable
+    # across application crashes and only risks the last commits on power loss.
+    if not read_only:
+        cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    if read_only:
+        cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _set_postgres_read_only(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY")
+    cursor.close()
+
+
+def make_engine(url: str, read_only: bool = False) -> Engine:
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000}
+        pool_args = {}
+        if ":memory:" not in url and url != "sqlite://":
+            pool_args = {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow, "pool_timeout": settings.db_pool_timeout}
+        new_engine = create_engine(url, echo=False, connect_args=connect_args, **pool_args)
+        event.listen(new_engine, "connect", lambda conn, record: _apply_sqlite_pragmas(conn, record, read_only))
+        return new_engine
+
+    new_engine = create_engine(
+        url,
+        echo=False,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+    )
+    if read_only and url.startswith("postgresql"):
+        event.listen(new_engine, "connect", _set_postgres_read_only)
+    return new_engine
+
+
+engine = make_engine(settings.db_url)
+# GET routes read through this engine; without DB_READ_URL it is the primary.
+# Cached catalogs and change requests stay on the primary: a lagging replica
+# would cache an old body under a new version, or hide a review just written.
+read_engine = make_engine(settings.db_read_url, read_only=True) if settings.db_read_url else engine
 
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    upgrade_schema()
+
+
+def upgrade_schema() -> None:
+    """Add columns introduced after a table was created; ``create_all`` only creates missing tables."""
+    inspector = inspect(engine)
+    quiz_columns = {column["name"] for column in inspector.get_columns("quiz")}
+    with engine.begin() as conn:
+        if "owner_id" not in quiz_columns:
+            conn.execute(text('ALTER TABLE quiz ADD COLUMN owner_id INTEGER REFERENCES "user" (id)'))
+            conn.execute(text("CREATE INDEX ix_quiz_owner_id ON quiz (owner_id)"))
+
+
+def insert_ignore(session: Session, table, rows: list[dict]) -> None:
+    """``INSERT ... ON CONFLICT DO NOTHING`` on SQLite and Postgres: rows that would violate a unique key are skipped."""
+    if session.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    session.execute(insert(table).on_conflict_do_nothing(), rows)
 
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+def get_read_session() -> Generator[Session, None, None]:
+    with Session(read_engine) as session:
+        yield session
@@ -6,23 +6,32 @@ from sqlmodel import Session, select
 from .config import get_settings
 from .db import get_session
 from .models import Role, User
+from .schemas import TokenData
 from .security import decode_token
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+def get_token_data(token: str = Depends(oauth2_scheme)) -> TokenData:
+    """Validate the bearer token without a database lookup; only enough for catalog 304s (see ``catalog_response``)."""
     try:
-        token_data = decode_token(token)
+        return decode_token(token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+
+def active_user(session: Session, token_data: TokenData) -> User:
     user = session.get(User, token_data.user_id)
     if not user or not user.active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
     return user
 
 
+def get_current_user(token_data: TokenData = Depends(get_token_data), session: Session = Depends(get_session)) -> User:
+    return active_user(session, token_data)
+
+
 def require_role(*roles: Role):
     def checker(user: User = Depends(get_current_user)) -> User:
         if user.role not in roles:
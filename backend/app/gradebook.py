@@ -0,0 +1,175 @@
+"""Streaming gradebook export: one row per quiz response, joined with its attempt, student and question."""
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from .db import read_engine
+from .models import Quiz, QuizAttempt, QuizQuestion, QuizResponse, User
+
+BATCH_SIZE = 5000
+
+COLUMNS = [
+    "attempt_id",
+    "student_id",
+    "student_name",
+    "roll_no",
+    "quiz_id",
+    "class_id",
+    "subject",
+    "submitted_at",
+    "score",
+    "question_id",
+    "topic",
+    "choice",
+    "correct",
+]
+
+
+def gradebook_query(
+    class_id: str | None = None,
+    subject: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+):
+    query = (
+        select(
+            QuizAttempt.id,
+            QuizAttempt.student_id,
+            User.name,
+            User.roll_no,
+            Quiz.id,
+            Quiz.class_id,
+            Quiz.subject,
+            QuizAttempt.submitted_at,
+            QuizAttempt.score,
+            QuizQuestion.id,
+            QuizQuestion.topic,
+            QuizResponse.choice,
+            QuizResponse.correct,
+        )
+        .select_from(QuizResponse)
+        .join(QuizAttempt, QuizAttempt.id == QuizResponse.attempt_id)
+        .join(Quiz, Quiz.id == QuizAttempt.quiz_id)
+        .join(QuizQuestion, QuizQuestion.id == QuizResponse.question_id)
+        .join(User, User.id == QuizAttempt.student_id)
+        .order_by(QuizAttempt.id, QuizResponse.id)
+    )
+    if class_id:
+        query = query.where(Quiz.class_id == class_id)
+    if subject:
+        query = query.where(Quiz.subject == subject)
+    if start:
+        query = query.where(QuizAttempt.submitted_at >= start)
+    if end:
+        query = query.where(QuizAttempt.submitted_at < end)
+    return query
+
+
+def iter_batches(query, batch_size: int = BATCH_SIZE) -> Iterator[list[tuple]]:
+    """Yield row batches from a server-side cursor.
+
+    The session is opened here rather than taken from a request dependency
+    because the response body is produced after the route returns.
+    """
+    with Session(read_engine) as session:
+        result = session.execute(query.execution_options(yield_per=batch_size, stream_results=True))
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+
+def stream_csv(query) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for batch in iter_batches(query):
+        for row in batch:
+            writer.writerow(_csv_row(row))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _csv_row(row: tuple) -> tuple:
+    submitted_at = row[7]
+    return row[:7] + (submitted_at.isoformat() if submitted_at else "",) + row[8:]
+
+
+class _Drain:
+    """Write-only file object whose bytes are handed out as the writer produces them."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(pa):
+    return pa.schema(
+        [
+            ("attempt_id", pa.int64()),
+            ("student_id", pa.int64()),
+            ("student_name", pa.string()),
+            ("roll_no", pa.string()),
+            ("quiz_id", pa.int64()),
+            ("class_id", pa.string()),
+            ("subject", pa.string()),
+            ("submitted_at", pa.timestamp("us")),
+            ("score", pa.float64()),
+            ("question_id", pa.int64()),
+            ("topic", pa.string()),
+            ("choice", pa.string()),
+            ("correct", pa.bool_()),
+        ]
+    )
+
+
+def stream_columnar(query, fmt: str) -> Iterator[bytes]:
+    """Parquet (one row group per batch) or Arrow IPC stream; needs the optional pyarrow package."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(pa)
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+    for batch in iter_batches(query):
+        columns = list(zip(*batch))
+        writer.write_batch(pa.record_batch([pa.array(col, type=field.type) for col, field in zip(columns, schema)], schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+def columnar_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,201 @@
+"""Classical item analysis for quiz questions.
+
+Responses for a quiz are loaded once into dense attempts x questions arrays
+and every statistic is computed column-wise with NumPy:
+
+- p-value: share of attempts answering the item correctly (difficulty);
+- point-biserial discrimination: correlation of the item with the rest score
+  (total minus the item itself);
+- distractor frequencies: how often each entry in ``options`` was chosen;
+- KR-20 reliability for the whole quiz and per topic.
+
+Results are cached per quiz and reused until a new attempt is recorded.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from .models import QuizAttempt, QuizQuestion, QuizResponse
+
+EASY_THRESHOLD = 0.9
+HARD_THRESHOLD = 0.2
+LOW_DISCRIMINATION = 0.2
+
+
+@dataclass
+class ResponseMatrix:
+    question_ids: np.ndarray  # (q,)
+    topics: list[str]
+    options: list[list[str]]
+    answers: list[str]
+    correct: np.ndarray  # (n, q) uint8; unanswered counts as incorrect
+    choices: np.ndarray  # (n, q) int16 index into options; -1 = blank/other
+
+
+def load_matrix(session: Session, quiz_id: int) -> ResponseMatrix:
+    questions = session.exec(
+        select(QuizQuestion.id, QuizQuestion.topic, QuizQuestion.options, QuizQuestion.answer)
+        .where(QuizQuestion.quiz_id == quiz_id)
+        .order_by(QuizQuestion.id)
+    ).all()
+    rows = session.exec(
+        select(QuizResponse.attempt_id, QuizResponse.question_id, QuizResponse.choice, QuizResponse.correct)
+        .join(QuizAttempt, QuizAttempt.id == QuizResponse.attempt_id)
+        .where(QuizAttempt.quiz_id == quiz_id, QuizAttempt.submitted_at.is_not(None))
+    ).all()
+
+    question_ids = np.array([q[0] for q in questions], dtype=np.int64)
+    options = [list(q[2] or []) for q in questions]
+    if not rows or not len(question_ids):
+        empty = np.zeros((0, len(question_ids)), dtype=np.uint8)
+        return ResponseMatrix(question_ids, [q[1] or "general" for q in questions], options, [q[3] for q in questions], empty, empty.astype(np.int16))
+
+    attempt_col, question_col, choice_col, correct_col = zip(*rows)
+    _, attempt_idx = np.unique(np.asarray(attempt_col, dtype=np.int64), return_inverse=True)
+    response_question_ids = np.asarray(question_col, dtype=np.int64)
+    question_idx = np.searchsorted(question_ids, response_question_ids)
+    question_idx = np.minimum(question_idx, len(question_ids) - 1)
+    known = question_ids[question_idx] == response_question_ids
+
+    option_codes = {(qid, text): code for qid, opts in zip(question_ids.tolist(), options) for code, text in enumerate(opts)}
+    choice_codes = np.fromiter((option_codes.get(key, -1) for key in zip(question_col, choice_col)), dtype=np.int16, count=len(rows))
+
+    n_attempts = int(attempt_idx.max()) + 1
+    correct = np.zeros((n_attempts, len(question_ids)), dtype=np.uint8)
+    choices = np.full((n_attempts, len(question_ids)), -1, dtype=np.int16)
+    correct[attempt_idx[known], question_idx[known]] = np.asarray(correct_col, dtype=np.uint8)[known]
+    choices[attempt_idx[known], question_idx[known]] = choice_codes[known]
+    return ResponseMatrix(question_ids, [q[1] or "general" for q in questions], options, [q[3] for q in questions], correct, choices)
+
+
+def kr20(correct: np.ndarray) -> float | None:
+    """Kuder-Richardson 20 for a 0/1 matrix; None when undefined."""
+    n, k = correct.shape
+    if n < 2 or k < 2:
+        return None
+    p = correct.mean(axis=0)
+    total_var = correct.sum(axis=1).var()
+    if total_var == 0:
+        return None
+    return float(k / (k - 1) * (1 - (p * (1 - p)).sum() / total_var))
+
+
+def analyze(matrix: ResponseMatrix) -> dict[str, Any]:
+    correct = matrix.correct.astype(np.float64)
+    n, q = correct.shape
+    p_values = correct.mean(axis=0) if n else np.full(q, np.nan)
+
+    # Point-biserial against the rest score, all columns at once.
+    rest = correct.sum(axis=1, keepdims=True) - correct
+    if n > 1:
+        x_centered = correct - p_values
+        y_centered = rest - rest.mean(axis=0)
+        cov = (x_centered * y_centered).mean(axis=0)
+        denom = correct.std(axis=0) * rest.std(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            discrimination = np.where(denom > 0, cov / denom, np.nan)
+    else:
+        discrimination = np.full(q, np.nan)
+
+    # Distractor counts for every (question, option) pair in one bincount.
+    width = max((len(opts) for opts in matrix.options), default=0) + 1
+    codes = matrix.choices.astype(np.int64) + 1  # 0 = blank/other
+    flat = (np.arange(q, dtype=np.int64) * width + codes).ravel()
+    counts = np.bincount(flat, minlength=q * width).reshape(q, width) if n else np.zeros((q, width), dtype=np.int64)
+
+    items = []
+    for col in range(q):
+        p = float(p_values[col]) if n else None
+        r = None if np.isnan(discrimination[col]) else float(discrimination[col])
+        options = matrix.options[col]
+        distractors = {text: int(counts[col, code + 1]) for code, text in enumerate(options)}
+        flags = []
+        if p is not None:
+            if p >= EASY_THRESHOLD:
+                flags.append("too_easy")
+            elif p <= HARD_THRESHOLD:
+                flags.append("too_hard")
+        if r is not None:
+            if r < 0:
+                flags.append("negative_discrimination")
+            elif r < LOW_DISCRIMINATION:
+                flags.append("low_discrimination")
+        if n and any(count == 0 for text, count in distractors.items() if text != matrix.answers[col]):
+            flags.append("unused_distractor")
+        items.append(
+            {
+                "question_id": int(matrix.question_ids[col]),
+                "topic": matrix.topics[col],
+                "p_value": p,
+                "discrimination": r,
+                "distractors": distractors,
+                "blank_or_other": int(counts[col, 0]),
+                "flags": flags,
+            }
+        )
+
+    topics = []
+    topic_names = np.asarray(matrix.topics, dtype=object)
+    for topic in sorted(set(matrix.topics)):
+        mask = topic_names == topic
+        topics.append({"topic": topic, "items": int(mask.sum()), "kr20": kr20(matrix.correct[:, mask])})
+
+    return {"attempts": n, "kr20": kr20(matrix.correct), "items": items, "topics": topics}
+
+
+class ItemAnalysisCache:
+    """Results per quiz, valid while the quiz's (submitted attempts, last submitted id) is unchanged."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[tuple[int, int], dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, quiz_id: int, fingerprint: tuple[int, int]) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(quiz_id)
+            if entry is None or entry[0] != fingerprint:
+                return None
+            self._entries.move_to_end(quiz_id)
+            return entry[1]
+
+    def put(self, quiz_id: int, fingerprint: tuple[int, int], result: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[quiz_id] = (fingerprint, result)
+            self._entries.move_to_end(quiz_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+item_analysis_cache = ItemAnalysisCache()
+
+
+def attempts_fingerprint(session: Session, quiz_id: int) -> tuple[int, int]:
+    # submitted_at is set in the same commit as the attempt's responses, so
+    # only finished attempts are counted (and analysed).
+    count, last_id = session.exec(
+        select(func.count(QuizAttempt.id), func.max(QuizAttempt.id)).where(
+            QuizAttempt.quiz_id == quiz_id, QuizAttempt.submitted_at.is_not(None)
+        )
+    ).one()
+    return int(count or 0), int(last_id or 0)
+
+
+def quiz_item_analysis(session: Session, quiz_id: int) -> dict[str, Any]:
+    fingerprint = attempts_fingerprint(session, quiz_id)
+    cached = item_analysis_cache.get(quiz_id, fingerprint)
+    if cached is not None:
+        return cached
+    result = {"quiz_id": quiz_id, **analyze(load_matrix(session, quiz_id))}
+    item_analysis_cache.put(quiz_id, fingerprint, result)
+    return result
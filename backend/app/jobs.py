@@ -0,0 +1,297 @@
+"""Durable in-process job queue.
+
+Jobs are rows in the ``job`` table, so they survive restarts and need no
+broker. Worker threads claim the highest-priority runnable row with a
+conditional UPDATE (portable across SQLite and Postgres) and hold it under a
+short lease that a heartbeat keeps fresh; if the process dies the lease
+lapses and the job is requeued. Failures are retried with exponential
+backoff. A unique ``active_key`` column enforces at most one queued/running
+job per dedupe key.
+"""
+import logging
+import os
+import secrets
+import socket
+import threading
+import traceback
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from .config import get_settings
+from .db import engine
+from .models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class JobContext:
+    """Handed to job handlers: a session of their own plus progress reporting."""
+
+    def __init__(self, session: Session, job: Job, runner: "JobRunner") -> None:
+        self.session = session
+        self.job = job
+        self._runner = runner
+
+    def progress(self, fraction: float, note: str | None = None) -> None:
+        """Record progress (0..1); commits in a separate session so the handler's own transaction is untouched."""
+        with Session(engine) as session:
+            session.execute(
+                update(Job)
+                .where(Job.id == self.job.id, Job.locked_by == self._runner.worker_id)
+                .values(progress=max(0.0, min(1.0, fraction)), progress_note=note, updated_at=datetime.utcnow())
+            )
+            session.commit()
+
+
+JobHandler = Callable[[JobContext, dict[str, Any]], dict[str, Any] | None]
+_handlers: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(
+    session: Session,
+    kind: str,
+    payload: dict[str, Any] | None = None,
+    *,
+    priority: int = 0,
+    dedupe_key: str | None = None,
+    max_attempts: int = 3,
+    created_by: int | None = None,
+) -> Job:
+    """Queue a job, or return the already active one with the same ``dedupe_key``."""
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if dedupe_key:
+        existing = _active_job(session, dedupe_key)
+        if existing:
+            return existing
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        dedupe_key=dedupe_key,
+        active_key=dedupe_key,
+        max_attempts=max_attempts,
+        created_by=created_by,
+    )
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        # Lost the race against another enqueue for the same key.
+        session.rollback()
+        existing = _active_job(session, dedupe_key)
+        if existing:
+            return existing
+        raise
+    session.refresh(job)
+    runner.wake()
+    return job
+
+
+def _active_job(session: Session, dedupe_key: str) -> Job | None:
+    return session.exec(select(Job).where(Job.active_key == dedupe_key)).first()
+
+
+def cancel(session: Session, job: Job) -> bool:
+    """Cancel a job that has not started yet."""
+    result = session.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == JobStatus.queued)
+        .values(status=JobStatus.cancelled, active_key=None, finished_at=datetime.utcnow(), updated_at=datetime.utcnow())
+    )
+    session.commit()
+    session.refresh(job)
+    return result.rowcount == 1
+
+
+class JobRunner:
+    def __init__(self) -> None:
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        self.lease_seconds = settings.job_lease_seconds
+        self.poll_interval = settings.job_poll_interval
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+    def start(self, workers: int) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        for n in range(workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads.clear()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception:
+                logger.exception("job worker loop failed")
+                worked = False
+            if not worked:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self) -> bool:
+        """Claim and run one job; returns False when nothing was runnable."""
+        job_id = self._claim()
+        if job_id is None:
+            return False
+        heartbeat = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job_id, heartbeat), daemon=True).start()
+        try:
+            with Session(engine) as session:
+                job = session.get(Job, job_id)
+                handler = _handlers.get(job.kind)
+                try:
+                    if handler is None:
+                        raise LookupError(f"No handler registered for {job.kind}")
+                    result = handler(JobContext(session, job, self), dict(job.payload))
+                except Exception as exc:
+                    session.rollback()
+                    self._fail(session, job, exc)
+                else:
+                    self._finish(session, job, result)
+        finally:
+            heartbeat.set()
+        return True
+
+    def _heartbeat(self, job_id: int, done: threading.Event) -> None:
+        # Keep the lease short (so a crashed process's jobs come back quickly)
+        # while long handlers keep running.
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                with Session(engine) as session:
+                    session.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == JobStatus.running, Job.locked_by == self.worker_id)
+                        .values(locked_until=datetime.utcnow() + timedelta(seconds=self.lease_seconds))
+                    )
+                    session.commit()
+            except Exception:
+                # A missed beat (e.g. the database was briefly locked) is retried on the next one.
+                logger.exception("job %s heartbeat failed", job_id)
+
+    def _claim(self) -> int | None:
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            self._requeue_expired(session, now)
+            candidates = session.exec(
+                select(Job.id)
+                .where(Job.status == JobStatus.queued, Job.run_after <= now)
+                .order_by(Job.priority.desc(), Job.id)
+                .limit(5)
+            ).all()
+            # Another worker may win the conditional UPDATE; try the next candidate.
+            for job_id in candidates:
+                claimed = session.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JobStatus.queued)
+                    .values(
+                        status=JobStatus.running,
+                        locked_by=self.worker_id,
+                        locked_until=now + timedelta(seconds=self.lease_seconds),
+                        attempts=Job.attempts + 1,
+                        updated_at=now,
+                    )
+                )
+                session.commit()
+                if claimed.rowcount == 1:
+                    return job_id
+        return None
+
+    def _requeue_expired(self, session: Session, now: datetime) -> None:
+        """Give jobs whose worker died (or whose process restarted) back to the queue, or fail them when out of attempts."""
+        expired = (Job.status == JobStatus.running, Job.locked_until < now)
+        failed = session.execute(
+            update(Job)
+            .where(*expired, Job.attempts >= Job.max_attempts)
+            .values(
+                status=JobStatus.failed,
+                error="Lease expired: the worker stopped before the job finished",
+                active_key=None,
+                locked_by=None,
+                locked_until=None,
+                finished_at=now,
+                updated_at=now,
+            )
+        )
+        if failed.rowcount:
+            logger.warning("%s job(s) failed permanently after their lease expired", failed.rowcount)
+        session.execute(
+            update(Job)
+            .where(*expired)
+            .values(status=JobStatus.queued, locked_by=None, locked_until=None, updated_at=now)
+        )
+        session.commit()
+
+    def _still_owned(self, session: Session, job: Job) -> bool:
+        session.refresh(job)
+        if job.status == JobStatus.running and job.locked_by == self.worker_id:
+            return True
+        # The lease lapsed and another worker took over; its outcome wins.
+        logger.warning("job %s lost its lease before finishing", job.id)
+        return False
+
+    def _finish(self, session: Session, job: Job, result: dict[str, Any] | None) -> None:
+        if not self._still_owned(session, job):
+            return
+        now = datetime.utcnow()
+        job.status = JobStatus.succeeded
+        job.result = result or {}
+        job.error = None
+        job.progress = 1.0
+        job.active_key = None
+        job.locked_by = None
+        job.locked_until = None
+        job.finished_at = now
+        job.updated_at = now
+        session.add(job)
+        session.commit()
+
+    def _fail(self, session: Session, job: Job, exc: Exception) -> None:
+        if not self._still_owned(session, job):
+            return
+        now = datetime.utcnow()
+        job.error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        job.locked_by = None
+        job.locked_until = None
+        job.updated_at = now
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.queued
+            job.run_after = now + timedelta(seconds=min(2 ** job.attempts, 300))
+        else:
+            logger.warning("job %s (%s) failed permanently: %s", job.id, job.kind, job.error)
+            job.status = JobStatus.failed
+            job.active_key = None
+            job.finished_at = now
+        session.add(job)
+        session.commit()
+
+
+runner = JobRunner()
@@ -1,17 +1,24 @@
 import os
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
 
+from . import tasks  # noqa: F401  (registers job handlers)
+from .admission import AdmissionMiddleware, admission
 from .config import get_settings
 from .db import engine, get_session, init_db
+from .jobs import runner
 from .models import Role, User
-from .routers import auth, change_requests, chat, quizzes, syllabus, users
+from .progress import backfill_progress
+from .routers import archive, auth, change_requests, chat, exports, jobs, metrics, quizzes, syllabus, users
 from .security import hash_password
 
 settings = get_settings()
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, default_response_class=ORJSONResponse)
 
+# Added before CORS so CORS wraps it and rejections still carry CORS headers.
+app.add_middleware(AdmissionMiddleware, controller=admission)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[settings.frontend_origin, "*"],
@@ -26,12 +33,25 @@ app.include_router(change_requests.router, prefix=settings.api_prefix)
 app.include_router(syllabus.router, prefix=settings.api_prefix)
 app.include_router(quizzes.router, prefix=settings.api_prefix)
 app.include_router(chat.router, prefix=settings.api_prefix)
+app.include_router(jobs.router, prefix=settings.api_prefix)
+app.include_router(exports.router, prefix=settings.api_prefix)
+app.include_router(metrics.router, prefix=settings.api_prefix)
+app.include_router(archive.router, prefix=settings.api_prefix)
 
 
 @app.on_event("startup")
 def on_startup():
     init_db()
     ensure_admin()
+    with Session(engine) as session:
+        backfill_progress(session)
+    if settings.job_workers > 0:
+        runner.start(settings.job_workers)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    runner.stop()
 
 
 def ensure_admin():
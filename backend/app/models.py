@@ -2,7 +2,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, List, Optional
 
-from sqlmodel import Column, DateTime, Field, JSON, Relationship, SQLModel
+from sqlalchemy import Index, text
+from sqlmodel import Column, DateTime, Field, JSON, Relationship, SQLModel, UniqueConstraint
 
 
 class Role(str, Enum):
@@ -17,6 +18,14 @@ class ChangeStatus(str, Enum):
     denied = "denied"
 
 
+class JobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
 class ChatScope(str, Enum):
     class_channel = "class"
     teacher_channel = "teacher"
@@ -49,7 +58,7 @@ class ChangeRequest(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     requested_changes: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
-    status: ChangeStatus = ChangeStatus.pending
+    status: ChangeStatus = Field(default=ChangeStatus.pending, index=True)
     reviewer_id: Optional[int] = Field(default=None, foreign_key="user.id")
     reviewer_note: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -68,11 +77,51 @@ class SyllabusItem(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class SyllabusProgress(SQLModel, table=True):
+    """Per class/subject/teacher rollup of syllabus items, maintained by the syllabus routes."""
+
+    __table_args__ = (
+        UniqueConstraint("class_id", "subject", "teacher_id"),
+        # NULLs are distinct in a unique constraint, so unassigned rows need their own index.
+        Index(
+            "uq_syllabusprogress_unassigned",
+            "class_id",
+            "subject",
+            unique=True,
+            sqlite_where=text("teacher_id IS NULL"),
+            postgresql_where=text("teacher_id IS NULL"),
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    class_id: str = Field(index=True)
+    subject: str
+    teacher_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    # "YYYY-MM-DD" -> count. Overdue depends on the current date, so pending
+    # items are kept by due day and summed at read time.
+    pending_due: dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON))
+    completed_by_day: dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class CatalogVersion(SQLModel, table=True):
+    """Catalog version counters shared by every API worker (see ``catalog_cache``)."""
+
+    kind: str = Field(primary_key=True)
+    class_id: str = Field(primary_key=True)
+    version: int = 0
+
+
 class Quiz(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     class_id: str
     subject: str
     generated_from: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    # Set on personalised (adaptive) quizzes: only this student sees or attempts them.
+    owner_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     questions: List["QuizQuestion"] = Relationship(back_populates="quiz")
@@ -92,16 +141,16 @@ class QuizQuestion(SQLModel, table=True):
 
 class QuizAttempt(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    quiz_id: int = Field(foreign_key="quiz.id")
-    student_id: int = Field(foreign_key="user.id")
+    quiz_id: int = Field(foreign_key="quiz.id", index=True)
+    student_id: int = Field(foreign_key="user.id", index=True)
     started_at: datetime = Field(default_factory=datetime.utcnow)
-    submitted_at: Optional[datetime] = None
+    submitted_at: Optional[datetime] = Field(default=None, index=True)
     score: Optional[float] = None
 
 
 class QuizResponse(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    attempt_id: int = Field(foreign_key="quizattempt.id")
+    attempt_id: int = Field(foreign_key="quizattempt.id", index=True)
     question_id: int = Field(foreign_key="quizquestion.id")
     choice: str
     correct: bool
@@ -130,11 +179,56 @@ class ChatThread(SQLModel, table=True):
 
 class ChatMessage(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    thread_id: int = Field(foreign_key="chatthread.id")
+    thread_id: int = Field(foreign_key="chatthread.id", index=True)
     sender_id: int = Field(foreign_key="user.id")
     role: Role
     body: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     thread: ChatThread = Relationship(back_populates="messages")
     sender: User = Relationship(back_populates="messages")
+
+
+class Job(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)
+    status: JobStatus = Field(default=JobStatus.queued, index=True)
+    priority: int = 0
+    payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    result: Optional[dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    dedupe_key: Optional[str] = Field(default=None, index=True)
+    # Mirrors dedupe_key only while queued/running; the unique index is what
+    # makes "one active job per key" hold across workers.
+    active_key: Optional[str] = Field(default=None, unique=True)
+    attempts: int = 0
+    max_attempts: int = 3
+    progress: float = 0.0
+    progress_note: Optional[str] = None
+    run_after: datetime = Field(default_factory=datetime.utcnow, index=True)
+    locked_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    created_by: Optional[int] = Field(default=None, foreign_key="user.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class ArchiveSegment(SQLModel, table=True):
+    """One compressed JSON Lines file of rows moved out of a hot table (see ``app.archive``)."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)
+    month: str = Field(index=True)  # "YYYY-MM" of the archived rows
+    path: str  # relative to ARCHIVE_DIR
+    rows: int
+    min_id: int
+    max_id: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class ArchiveSegmentKey(SQLModel, table=True):
+    """A thread id (chat messages) or student id (quiz responses) present in an ``ArchiveSegment``'s file."""
+
+    segment_id: int = Field(foreign_key="archivesegment.id", primary_key=True)
+    key: int = Field(primary_key=True, index=True)
@@ -0,0 +1,190 @@
+"""Syllabus progress rollups.
+
+One ``SyllabusProgress`` row per (class, subject, teacher) carries counts plus
+day buckets for pending due dates and completions. The syllabus routes call
+:func:`apply_item_change` in the same transaction as the item write, so the
+rollup moves by the item's old and new contribution instead of being
+recounted. Overdue and velocity depend on today's date and are derived from
+the buckets when read.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from .db import insert_ignore
+from .models import SyllabusItem, SyllabusProgress
+
+VELOCITY_DAYS = 28
+DUE_SOON_DAYS = 7
+HISTORY_DAYS = 180  # completion buckets older than this are dropped
+
+
+@dataclass(frozen=True)
+class ItemState:
+    """What one syllabus item contributes to its rollup row."""
+
+    class_id: str
+    subject: str
+    teacher_id: int | None
+    completed: bool
+    due_day: str | None
+    completed_day: str | None
+
+
+def item_state(item: SyllabusItem) -> ItemState:
+    return _state(item.class_id, item.subject, item.teacher_id, item.status, item.due_date, item.completed_at)
+
+
+def _state(
+    class_id: str,
+    subject: str,
+    teacher_id: int | None,
+    status: str,
+    due_date: datetime | None,
+    completed_at: datetime | None,
+) -> ItemState:
+    completed = status == "completed"
+    return ItemState(
+        class_id=class_id,
+        subject=subject,
+        teacher_id=teacher_id,
+        completed=completed,
+        due_day=due_date.date().isoformat() if due_date else None,
+        completed_day=completed_at.date().isoformat() if completed and completed_at else None,
+    )
+
+
+def apply_item_change(session: Session, before: ItemState | None, after: ItemState | None) -> None:
+    """Move the rollup from ``before`` to ``after`` (``None`` for a created/deleted item); the caller commits."""
+    if before == after:
+        return
+    for state, sign in ((before, -1), (after, 1)):
+        if state is not None:
+            row = _rollup_row(session, state)
+            _apply(row, state, sign)
+            session.add(row)
+
+
+def _rollup_row(session: Session, state: ItemState) -> SyllabusProgress:
+    # FOR UPDATE can't lock a row that doesn't exist yet, so make sure it does:
+    # of two concurrent first writers one inserts and the other skips, and both
+    # then serialize on the lock (Postgres; SQLite already allows a single writer).
+    empty = SyllabusProgress(class_id=state.class_id, subject=state.subject, teacher_id=state.teacher_id)
+    insert_ignore(session, SyllabusProgress.__table__, [empty.model_dump(exclude={"id"})])
+    return session.exec(
+        select(SyllabusProgress)
+        .where(
+            SyllabusProgress.class_id == state.class_id,
+            SyllabusProgress.subject == state.subject,
+            SyllabusProgress.teacher_id == state.teacher_id,
+        )
+        .with_for_update()
+    ).one()
+
+
+def _apply(row: SyllabusProgress, state: ItemState, sign: int) -> None:
+    row.total += sign
+    if state.completed:
+        row.completed += sign
+        if state.completed_day:
+            oldest = (date.today() - timedelta(days=HISTORY_DAYS)).isoformat()
+            buckets = {day: n for day, n in (row.completed_by_day or {}).items() if day >= oldest}
+            row.completed_by_day = _bump(buckets, state.completed_day, sign)
+    else:
+        row.pending += sign
+        if state.due_day:
+            row.pending_due = _bump(row.pending_due or {}, state.due_day, sign)
+    row.updated_at = datetime.utcnow()
+
+
+def _bump(buckets: dict[str, int], day: str, delta: int) -> dict[str, int]:
+    # Always a new dict: plain JSON columns only notice reassignment.
+    updated = dict(buckets)
+    count = updated.get(day, 0) + delta
+    if count > 0:
+        updated[day] = count
+    else:
+        updated.pop(day, None)
+    return updated
+
+
+def load_progress(
+    session: Session,
+    class_id: str | None = None,
+    subject: str | None = None,
+    teacher_id: int | None = None,
+) -> list[dict[str, Any]]:
+    # Plain column rows: materialising ORM instances costs more than the summaries.
+    query = select(*SyllabusProgress.__table__.columns).order_by(
+        SyllabusProgress.class_id, SyllabusProgress.subject, SyllabusProgress.teacher_id
+    )
+    if class_id:
+        query = query.where(SyllabusProgress.class_id == class_id)
+    if subject:
+        query = query.where(SyllabusProgress.subject == subject)
+    if teacher_id is not None:
+        query = query.where(SyllabusProgress.teacher_id == teacher_id)
+    today = date.today()
+    return [summarize(row, today) for row in session.exec(query)]
+
+
+def summarize(row: Any, today: date | None = None) -> dict[str, Any]:
+    today = today or date.today()
+    today_key = today.isoformat()
+    soon_key = (today + timedelta(days=DUE_SOON_DAYS)).isoformat()
+    since_key = (today - timedelta(days=VELOCITY_DAYS)).isoformat()
+    pending_due = row.pending_due or {}
+    recent = sum(n for day, n in (row.completed_by_day or {}).items() if day > since_key)
+    return {
+        "class_id": row.class_id,
+        "subject": row.subject,
+        "teacher_id": row.teacher_id,
+        "total": row.total,
+        "completed": row.completed,
+        "pending": row.pending,
+        "overdue": sum(n for day, n in pending_due.items() if day < today_key),
+        "due_soon": sum(n for day, n in pending_due.items() if today_key <= day < soon_key),
+        "completion_rate": round(row.completed / row.total, 4) if row.total else None,
+        "velocity_per_week": round(recent * 7 / VELOCITY_DAYS, 2),
+        "updated_at": row.updated_at,
+    }
+
+
+def rebuild_progress(session: Session) -> int:
+    """Recompute every rollup from ``SyllabusItem`` (backfill or repair); returns the number of rows."""
+    rows: dict[tuple[str, str, int | None], SyllabusProgress] = {}
+    items = session.exec(
+        select(
+            SyllabusItem.class_id,
+            SyllabusItem.subject,
+            SyllabusItem.teacher_id,
+            SyllabusItem.status,
+            SyllabusItem.due_date,
+            SyllabusItem.completed_at,
+        ).execution_options(yield_per=5000)
+    )
+    for fields in items:
+        state = _state(*fields)
+        key = (state.class_id, state.subject, state.teacher_id)
+        if key not in rows:
+            rows[key] = SyllabusProgress(class_id=state.class_id, subject=state.subject, teacher_id=state.teacher_id)
+        _apply(rows[key], state, 1)
+
+    session.exec(delete(SyllabusProgress))
+    if rows:
+        session.execute(
+            insert(SyllabusProgress.__table__),
+            [row.model_dump(exclude={"id"}) for row in rows.values()],
+        )
+    session.commit()
+    return len(rows)
+
+
+def backfill_progress(session: Session) -> None:
+    """Build the rollups once for databases created before they existed."""
+    if session.exec(select(SyllabusProgress.id).limit(1)).first() is None and session.exec(select(SyllabusItem.id).limit(1)).first() is not None:
+        rebuild_progress(session)
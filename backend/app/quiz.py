@@ -1,6 +1,9 @@
 import random
-from typing import List
+from typing import Any, List
 
+from sqlmodel import Session
+
+from .catalog_cache import QUIZZES, catalog_cache
 from .models import Quiz, QuizQuestion
 
 
@@ -29,19 +32,33 @@ def generate_questions(topics: List[str], num_questions: int) -> list[QuizQuesti
     selected = (topics or ["general principle"]) * 1
     pool = selected[:]
     random.shuffle(pool)
-    questions: list[QuizQuestion] = []
-    for i in range(num_questions):
-        topic = pool[i % len(pool)] if pool else "general"
-        prompt = random.choice(QUIZ_TEMPLATES).format(topic=topic)
-        options = synthesize_options(topic)
-        answer = f"Core fact about {topic}"
-        explanation = f"We expect recall of key concept for {topic}."
-        questions.append(
-            QuizQuestion(prompt=prompt, options=options, answer=answer, explanation=explanation, topic=topic)
-        )
-    return questions
+    return [build_question(pool[i % len(pool)] if pool else "general") for i in range(num_questions)]
+
+
+def build_question(topic: str) -> QuizQuestion:
+    return QuizQuestion(**question_fields(topic))
+
+
+def question_fields(topic: str) -> dict[str, Any]:
+    return {
+        "prompt": random.choice(QUIZ_TEMPLATES).format(topic=topic),
+        "options": synthesize_options(topic),
+        "answer": f"Core fact about {topic}",
+        "explanation": f"We expect recall of key concept for {topic}.",
+        "topic": topic,
+    }
 
 
 def attach_questions(quiz: Quiz, topics: List[str], num_questions: int) -> Quiz:
     quiz.questions = generate_questions(topics, num_questions)
     return quiz
+
+
+def create_quiz(session: Session, class_id: str, subject: str, topics: List[str], num_questions: int) -> Quiz:
+    quiz = Quiz(class_id=class_id, subject=subject, generated_from={"topics": topics})
+    quiz = attach_questions(quiz, topics, num_questions)
+    session.add(quiz)
+    catalog_cache.bump(session, QUIZZES, quiz.class_id)
+    session.commit()
+    session.refresh(quiz)
+    return quiz
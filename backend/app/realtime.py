@@ -0,0 +1,280 @@
+"""Chat WebSocket connections: wire protocols, batched delivery and heartbeats.
+
+Clients pick an encoding through the WebSocket subprotocol header:
+
+- ``chat.v2.json`` / ``chat.v2.msgpack``: every frame is an object with any of
+  ``messages`` (list of ``{id, sender_id, sender, role, body, ts}``, ``ts`` in
+  epoch milliseconds), ``errors`` (list of strings) and ``ping`` (server
+  time). Messages broadcast within ``WS_BATCH_WINDOW_MS`` of each other go
+  out as one frame, and the server sends a ``ping`` whenever the client has
+  been silent for ``WS_HEARTBEAT_S``. A client that sends nothing
+  (``{"type": "pong"}`` will do) for ``WS_IDLE_TIMEOUT_S`` is closed and
+  dropped from the manager.
+- no subprotocol: the original format, one JSON object per frame and no
+  pings. These clients may only ever listen, so silence is not a reason to
+  close them; dead peers are caught by uvicorn's protocol-level ping/pong
+  (``--ws-ping-interval``/``--ws-ping-timeout``) or a failed send.
+
+Pings and idle checks for v2 sockets run on their own timer, so a busy
+thread still reaps clients that have gone quiet.
+
+Every connection has a bounded outbound queue drained by its own task, so a
+broadcast never waits on a slow socket; one that falls ``WS_SEND_QUEUE``
+events behind is disconnected. Compression is permessage-deflate, negotiated
+by uvicorn (``--ws-per-message-deflate``, on by default) rather than here.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+from starlette.websockets import WebSocket, WebSocketState
+
+from .config import get_settings
+
+settings = get_settings()
+
+JSON_V2 = "chat.v2.json"
+MSGPACK_V2 = "chat.v2.msgpack"
+IDLE_CLOSE_CODE = 4408
+OVERFLOW_CLOSE_CODE = 4429
+
+MESSAGE, ERROR, PING = "message", "error", "ping"
+Event = tuple[str, Any]  # (MESSAGE, message dict) | (ERROR, detail) | (PING, server time)
+
+
+def msgpack_available() -> bool:
+    try:
+        import msgpack  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class WireProtocol:
+    name: str | None
+    batched: bool
+    binary: bool = False
+
+    def encode(self, events: list[Event]) -> str | bytes:
+        if not self.batched:
+            return orjson.dumps(_legacy_frame(events[0])).decode()
+        frame: dict[str, Any] = {}
+        for kind, payload in events:
+            if kind == PING:
+                frame[PING] = payload
+            else:
+                frame.setdefault(f"{kind}s", []).append(payload)
+        if self.binary:
+            import msgpack
+
+            return msgpack.packb(frame)
+        return orjson.dumps(frame).decode()
+
+    def decode(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Parse a ``websocket.receive`` message; raises ``ValueError`` on anything but an object."""
+        if self.binary:
+            import msgpack
+
+            data = message.get("bytes")
+            try:
+                payload = msgpack.unpackb(data) if data is not None else None
+            except Exception as exc:
+                raise ValueError("Invalid MessagePack frame") from exc
+        else:
+            data = message.get("text") if message.get("text") is not None else message.get("bytes")
+            try:
+                payload = orjson.loads(data) if data is not None else None
+            except orjson.JSONDecodeError as exc:
+                raise ValueError("Invalid JSON frame") from exc
+        if not isinstance(payload, dict):
+            raise ValueError("Frame must be an object")
+        return payload
+
+
+LEGACY = WireProtocol(None, batched=False)
+PROTOCOLS = {JSON_V2: WireProtocol(JSON_V2, batched=True), MSGPACK_V2: WireProtocol(MSGPACK_V2, batched=True, binary=True)}
+
+
+def negotiate(offered: list[str]) -> WireProtocol:
+    """First protocol the client offered that this server speaks, else the legacy format."""
+    for name in offered:
+        if name == MSGPACK_V2 and not msgpack_available():
+            continue
+        if name in PROTOCOLS:
+            return PROTOCOLS[name]
+    return LEGACY
+
+
+def _legacy_frame(event: Event) -> dict[str, Any]:
+    kind, payload = event
+    if kind == ERROR:
+        return {"error": payload}
+    return {"sender": payload["sender"], "role": payload["role"], "body": payload["body"]}
+
+
+class Connection:
+    def __init__(self, websocket: WebSocket, thread_id: int, protocol: WireProtocol) -> None:
+        self.websocket = websocket
+        self.thread_id = thread_id
+        self.protocol = protocol
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=settings.ws_send_queue)
+        self.last_seen = time.monotonic()
+        self.close_code = 1000
+        self.closing = asyncio.Event()
+
+    def push(self, event: Event) -> bool:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def next_batch(self, timeout: float) -> list[Event]:
+        """Wait up to ``timeout`` for an event, then gather whatever else arrives within the batch window."""
+        batch = [await asyncio.wait_for(self.queue.get(), timeout)]
+        if not self.protocol.batched:
+            return batch
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.ws_batch_window_ms / 1000
+        while len(batch) < settings.ws_batch_max:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def send(self, events: list[Event]) -> None:
+        if self.protocol.batched:
+            frames = [self.protocol.encode(events)]
+        else:
+            frames = [self.protocol.encode([event]) for event in events]
+        for frame in frames:
+            if isinstance(frame, bytes):
+                await self.websocket.send_bytes(frame)
+            else:
+                await self.websocket.send_text(frame)
+
+
+class ConnectionManager:
+    def __init__(self) -> None:
+        self.active: dict[int, list[Connection]] = {}
+        self.stats: Counter[str] = Counter()
+
+    async def connect(self, thread_id: int, websocket: WebSocket) -> Connection:
+        protocol = negotiate(websocket.scope.get("subprotocols") or [])
+        await websocket.accept(subprotocol=protocol.name)
+        conn = Connection(websocket, thread_id, protocol)
+        self.active.setdefault(thread_id, []).append(conn)
+        self.stats["connected"] += 1
+        return conn
+
+    def disconnect(self, conn: Connection) -> None:
+        connections = self.active.get(conn.thread_id)
+        if connections and conn in connections:
+            connections.remove(conn)
+            if not connections:
+                del self.active[conn.thread_id]
+
+    def broadcast(self, thread_id: int, event: Event) -> None:
+        """Queue ``event`` for every socket on the thread; delivery happens on each socket's sender task."""
+        for conn in list(self.active.get(thread_id, ())):
+            if not conn.push(event):
+                # Too far behind to catch up: drop it instead of buffering without bound.
+                self.stats["overflowed"] += 1
+                conn.close_code = OVERFLOW_CLOSE_CODE
+                self.disconnect(conn)
+                conn.closing.set()
+        self.stats["broadcast"] += 1
+
+    async def serve(self, conn: Connection, handle: Callable[[Connection, dict[str, Any]], Awaitable[None]]) -> None:
+        """Run the socket until the client leaves, goes idle or overflows, then release it."""
+        tasks = {
+            asyncio.create_task(self._send_loop(conn)),
+            asyncio.create_task(self._receive_loop(conn, handle)),
+            asyncio.create_task(conn.closing.wait()),
+        }
+        if conn.protocol.batched:
+            tasks.add(asyncio.create_task(self._watch_idle(conn)))
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # The send loop also checks ``closing``: on Python < 3.12 wait_for can swallow a cancel.
+            conn.closing.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+            self.disconnect(conn)
+            if conn.websocket.application_state == WebSocketState.CONNECTED and conn.websocket.client_state == WebSocketState.CONNECTED:
+                try:
+                    await conn.websocket.close(conn.close_code)
+                except Exception:
+                    pass
+
+    async def _receive_loop(self, conn: Connection, handle: Callable[[Connection, dict[str, Any]], Awaitable[None]]) -> None:
+        while True:
+            message = await conn.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            conn.last_seen = time.monotonic()
+            try:
+                event = conn.protocol.decode(message)
+            except ValueError as exc:
+                conn.push((ERROR, str(exc)))
+                continue
+            if event.get("type") in ("ping", "pong"):
+                continue
+            await handle(conn, event)
+
+    async def _send_loop(self, conn: Connection) -> None:
+        while not conn.closing.is_set():
+            try:
+                batch = await conn.next_batch(settings.ws_heartbeat_s)
+            except asyncio.TimeoutError:
+                continue
+            try:
+                await conn.send(batch)
+            except Exception:
+                # The peer is gone; the receive side will see the disconnect too.
+                return
+            self.stats["frames"] += 1
+            self.stats["events"] += len(batch)
+
+    async def _watch_idle(self, conn: Connection) -> None:
+        """Ping a quiet v2 client every heartbeat and return (closing the socket) once it has been silent too long."""
+        timeout = settings.ws_idle_timeout_s
+        tick = min(settings.ws_heartbeat_s, timeout) / 2
+        last_ping = time.monotonic()
+        while True:
+            await asyncio.sleep(tick)
+            now = time.monotonic()
+            if now - conn.last_seen > timeout:
+                self.stats["reaped"] += 1
+                conn.close_code = IDLE_CLOSE_CODE
+                return
+            if now - max(conn.last_seen, last_ping) >= settings.ws_heartbeat_s:
+                conn.push((PING, int(time.time() * 1000)))
+                last_ping = now
+
+    def snapshot(self) -> dict[str, Any]:
+        protocols = Counter(conn.protocol.name or "legacy" for connections in self.active.values() for conn in connections)
+        return {
+            "connections": sum(protocols.values()),
+            "threads": len(self.active),
+            "protocols": dict(protocols),
+            **self.stats,
+        }
+
+
+manager = ConnectionManager()
@@ -0,0 +1,122 @@
+"""Reviewing profile change requests.
+
+Approving a request applies its ``requested_changes`` to the user. Changes
+are validated against :class:`UserUpdate` (only fields an admin could set
+with ``PATCH /users/{id}``). A batch of decisions is written in one
+transaction: a conditional UPDATE claims the requests that are still pending
+(another reviewer may have got there first; SQLite ignores ``FOR UPDATE``),
+then one bulk UPDATE applies the claimed approvals to the users.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import case, literal, update
+from sqlmodel import Session, select
+
+from .models import ChangeRequest, ChangeStatus, User
+from .schemas import ChangeRequestDecision, UserUpdate
+
+ID_CHUNK = 500
+
+
+def validate_changes(requested: dict[str, Any]) -> dict[str, Any]:
+    """Return the changes as ``UserUpdate`` would apply them; raises ``ValueError`` when invalid."""
+    unknown = set(requested) - set(UserUpdate.model_fields)
+    if unknown:
+        raise ValueError(f"Unsupported fields: {', '.join(sorted(unknown))}")
+    try:
+        return UserUpdate.model_validate(requested).model_dump(exclude_unset=True)
+    except ValidationError as exc:
+        raise ValueError("; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in exc.errors())) from exc
+
+
+def review_requests(session: Session, reviewer_id: int, decisions: list[ChangeRequestDecision]) -> dict[str, Any]:
+    """Apply decisions to pending requests; undecidable ones are reported in ``failed`` and left untouched."""
+    ids = [decision.id for decision in decisions]
+    found: dict[int, tuple[int, dict[str, Any], ChangeStatus]] = {}
+    for start in range(0, len(ids), ID_CHUNK):
+        rows = session.exec(
+            select(ChangeRequest.id, ChangeRequest.user_id, ChangeRequest.requested_changes, ChangeRequest.status)
+            .where(ChangeRequest.id.in_(ids[start : start + ID_CHUNK]))
+            .with_for_update()
+        ).all()
+        found.update((row[0], tuple(row[1:])) for row in rows)
+
+    now = datetime.utcnow()
+    approved: list[int] = []
+    denied: list[int] = []
+    failed: list[dict[str, Any]] = []
+    approved_changes: list[tuple[int, int, dict[str, Any]]] = []
+    request_rows: list[ChangeRequestDecision] = []
+    seen: set[int] = set()
+    for decision in decisions:
+        if decision.id in seen:
+            failed.append({"id": decision.id, "reason": "duplicate", "error": "Request appears more than once"})
+            continue
+        seen.add(decision.id)
+        if decision.id not in found:
+            failed.append({"id": decision.id, "reason": "not_found", "error": "Request not found"})
+            continue
+        user_id, requested, current = found[decision.id]
+        if current != ChangeStatus.pending:
+            failed.append({"id": decision.id, "reason": "not_pending", "error": f"Request already {current.value}"})
+            continue
+        if decision.status == ChangeStatus.approved:
+            try:
+                changes = validate_changes(requested or {})
+            except ValueError as exc:
+                failed.append({"id": decision.id, "reason": "invalid", "error": str(exc)})
+                continue
+            approved_changes.append((decision.id, user_id, changes))
+            approved.append(decision.id)
+        elif decision.status == ChangeStatus.denied:
+            denied.append(decision.id)
+        else:
+            failed.append({"id": decision.id, "reason": "invalid", "error": "Decision must be approved or denied"})
+            continue
+        request_rows.append(decision)
+
+    claimed = _claim_pending(session, reviewer_id, request_rows, now)
+    for decision in request_rows:
+        if decision.id not in claimed:
+            failed.append({"id": decision.id, "reason": "not_pending", "error": "Request was reviewed concurrently"})
+    approved = [request_id for request_id in approved if request_id in claimed]
+    denied = [request_id for request_id in denied if request_id in claimed]
+
+    # Several approved requests for one user merge in submission order.
+    user_changes: dict[int, dict[str, Any]] = {}
+    for request_id, user_id, changes in sorted(approved_changes, key=lambda item: item[0]):
+        if request_id in claimed:
+            user_changes.setdefault(user_id, {}).update(changes)
+
+    # ORM bulk UPDATE by primary key: one executemany per distinct set of columns.
+    user_rows = [{"id": user_id, **changes, "updated_at": now} for user_id, changes in user_changes.items() if changes]
+    if user_rows:
+        session.execute(update(User), user_rows)
+    session.commit()
+    return {"approved": approved, "denied": denied, "failed": failed}
+
+
+def _claim_pending(session: Session, reviewer_id: int, decisions: list[ChangeRequestDecision], now: datetime) -> set[int]:
+    """Write the decisions onto requests that are still pending; returns the ids that were updated."""
+    status_type = ChangeRequest.__table__.c.status.type
+    claimed: set[int] = set()
+    for start in range(0, len(decisions), ID_CHUNK):
+        chunk = decisions[start : start + ID_CHUNK]
+        # CASE on id sets per-request values in one statement; RETURNING reports which rows matched.
+        statement = (
+            update(ChangeRequest)
+            .where(ChangeRequest.id.in_([decision.id for decision in chunk]), ChangeRequest.status == ChangeStatus.pending)
+            .values(
+                status=case({decision.id: literal(decision.status, status_type) for decision in chunk}, value=ChangeRequest.id),
+                reviewer_note=case({decision.id: decision.reviewer_note for decision in chunk}, value=ChangeRequest.id),
+                reviewer_id=reviewer_id,
+                updated_at=now,
+            )
+            .returning(ChangeRequest.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed.update(session.execute(statement).scalars())
+    return claimed
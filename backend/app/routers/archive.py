@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+from sqlmodel import Session
+
+from ..archive import archive_stats
+from ..db import get_read_session, get_session
+from ..deps import get_admin
+from ..jobs import enqueue
+from ..models import User
+from ..schemas import JobOut
+
+router = APIRouter(prefix="/archive", tags=["archive"])
+
+
+@router.post("/run", response_model=JobOut, status_code=202)
+def run(session: Session = Depends(get_session), admin: User = Depends(get_admin)):
+    return enqueue(session, "archive.run", dedupe_key="archive", created_by=admin.id)
+
+
+@router.get("/segments")
+def segments(session: Session = Depends(get_read_session), _: User = Depends(get_admin)):
+    return archive_stats(session)
@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
 
 from ..db import get_session
 from ..deps import get_current_user, require_role
 from ..models import ChangeRequest, ChangeStatus, Role, User
-from ..schemas import ChangeRequestCreate, ChangeRequestOut, ChangeRequestReview
+from ..reviews import review_requests
+from ..schemas import (
+    BulkReviewOut,
+    BulkReviewRequest,
+    ChangeRequestCreate,
+    ChangeRequestDecision,
+    ChangeRequestOut,
+    ChangeRequestPage,
+    ChangeRequestReview,
+)
+from ..serialization import row_dumper, trusted_response
 
 router = APIRouter(prefix="/change-requests", tags=["change-requests"])
 
+REVIEW_ERROR_STATUS = {"not_found": 404, "not_pending": 409, "invalid": 400}
+
 
 @router.post("/", response_model=ChangeRequestOut)
 def submit_change_request(payload: ChangeRequestCreate, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
@@ -20,7 +35,7 @@ def submit_change_request(payload: ChangeRequestCreate, session: Session = Depen
 
 @router.get("/", response_model=list[ChangeRequestOut])
 def list_requests(session: Session = Depends(get_session), _: User = Depends(require_role(Role.admin))):
-    return session.exec(select(ChangeRequest)).all()
+    return trusted_response(ChangeRequestOut, session.exec(select(ChangeRequest)).all())
 
 
 @router.post("/{request_id}/review", response_model=ChangeRequestOut)
@@ -30,18 +45,49 @@ def review_request(
     session: Session = Depends(get_session),
     admin: User = Depends(require_role(Role.admin)),
 ):
-    cr = session.get(ChangeRequest, request_id)
-    if not cr:
-        raise HTTPException(status_code=404, detail="Request not found")
-    cr.status = payload.status
-    cr.reviewer_id = admin.id
-    cr.reviewer_note = payload.reviewer_note
-    session.add(cr)
-    session.commit()
-    session.refresh(cr)
-    return cr
+    decision = ChangeRequestDecision(id=request_id, status=payload.status, reviewer_note=payload.reviewer_note)
+    result = review_requests(session, admin.id, [decision])
+    if result["failed"]:
+        failure = result["failed"][0]
+        raise HTTPException(status_code=REVIEW_ERROR_STATUS.get(failure["reason"], 400), detail=failure["error"])
+    return session.get(ChangeRequest, request_id)
+
+
+@router.post("/bulk-review", response_model=BulkReviewOut)
+def bulk_review(payload: BulkReviewRequest, session: Session = Depends(get_session), admin: User = Depends(require_role(Role.admin))):
+    return review_requests(session, admin.id, payload.decisions)
+
+
+@router.get("/pending", response_model=ChangeRequestPage)
+def pending_requests(
+    after_id: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    user_id: int | None = None,
+    role: Role | None = None,
+    since: datetime | None = None,
+    session: Session = Depends(get_session),
+    _: User = Depends(require_role(Role.admin)),
+):
+    # Keyset pagination on id: pass the returned next_after_id to get the next page.
+    query = (
+        select(ChangeRequest)
+        .where(ChangeRequest.status == ChangeStatus.pending, ChangeRequest.id > after_id)
+        .order_by(ChangeRequest.id)
+        .limit(limit + 1)
+    )
+    if user_id is not None:
+        query = query.where(ChangeRequest.user_id == user_id)
+    if role is not None:
+        query = query.join(User, User.id == ChangeRequest.user_id).where(User.role == role)
+    if since is not None:
+        query = query.where(ChangeRequest.created_at >= since)
+    rows = session.exec(query).all()
+    page = rows[:limit]
+    next_after_id = page[-1].id if len(rows) > limit else None
+    dump = row_dumper(ChangeRequestOut)
+    return ORJSONResponse({"items": [dump(row) for row in page], "next_after_id": next_after_id})
 
 
 @router.get("/mine", response_model=list[ChangeRequestOut])
 def my_requests(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    return session.exec(select(ChangeRequest).where(ChangeRequest.user_id == user.id)).all()
+    return trusted_response(ChangeRequestOut, session.exec(select(ChangeRequest).where(ChangeRequest.user_id == user.id)).all())
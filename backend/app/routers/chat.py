@@ -1,37 +1,23 @@
-from typing import Dict, List
+from datetime import timezone
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
 
 from ..ai import ask_ai
-from ..db import get_session
+from ..archive import archived_messages
+from ..db import engine, get_read_session, get_session
 from ..deps import get_current_user
 from ..models import ChatMessage, ChatScope, ChatThread, Role, User
+from ..realtime import ERROR, MESSAGE, Connection, manager
 from ..schemas import AIChatRequest, AIChatResponse, ChatMessageCreate, ChatMessageOut, ChatThreadCreate, ChatThreadOut
+from ..serialization import row_dumper, trusted_response
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
 
-class ConnectionManager:
-    def __init__(self) -> None:
-        self.active: Dict[int, List[WebSocket]] = {}
-
-    async def connect(self, thread_id: int, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self.active.setdefault(thread_id, []).append(websocket)
-
-    def disconnect(self, thread_id: int, websocket: WebSocket) -> None:
-        if thread_id in self.active and websocket in self.active[thread_id]:
-            self.active[thread_id].remove(websocket)
-
-    async def broadcast(self, thread_id: int, message: dict) -> None:
-        for ws in self.active.get(thread_id, []):
-            await ws.send_json(message)
-
-
-manager = ConnectionManager()
-
-
 @router.post("/threads", response_model=ChatThreadOut)
 def create_thread(payload: ChatThreadCreate, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
     thread = ChatThread(scope=payload.scope, subject=payload.subject, owner_id=user.id, audience=payload.audience)
@@ -42,8 +28,8 @@ def create_thread(payload: ChatThreadCreate, session: Session = Depends(get_sess
 
 
 @router.get("/threads", response_model=list[ChatThreadOut])
-def list_threads(session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    return session.exec(select(ChatThread)).all()
+def list_threads(session: Session = Depends(get_read_session), user: User = Depends(get_current_user)):
+    return trusted_response(ChatThreadOut, session.exec(select(ChatThread)).all())
 
 
 @router.post("/threads/{thread_id}/messages", response_model=ChatMessageOut)
@@ -58,28 +44,64 @@ def post_message(thread_id: int, payload: ChatMessageCreate, session: Session =
     return msg
 
 
+@router.get("/threads/{thread_id}/messages", response_model=list[ChatMessageOut])
+def list_messages(
+    thread_id: int,
+    before_id: int | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    include_archived: bool = False,
+    session: Session = Depends(get_read_session),
+    user: User = Depends(get_current_user),
+):
+    """Newest first; page back with ``before_id`` set to the last id received."""
+    if not session.get(ChatThread, thread_id):
+        raise HTTPException(status_code=404, detail="Thread not found")
+    query = select(ChatMessage).where(ChatMessage.thread_id == thread_id).order_by(ChatMessage.id.desc()).limit(limit)
+    if before_id is not None:
+        query = query.where(ChatMessage.id < before_id)
+    dump = row_dumper(ChatMessageOut)
+    messages = [dump(msg) for msg in session.exec(query).all()]
+    if include_archived:
+        # Archival goes by created_at, so archived ids can interleave with hot ones; merge rather than append.
+        messages.extend(archived_messages(session, thread_id, before_id, limit))
+        messages = sorted(messages, key=lambda msg: msg["id"], reverse=True)[:limit]
+    return ORJSONResponse(messages)
+
+
+def _store_message(thread_id: int, user_id: int | None, body: str) -> dict[str, Any] | None:
+    # A short session per message: holding one per socket would pin a pooled connection for the socket's lifetime.
+    with Session(engine) as session:
+        user = session.get(User, user_id) if user_id else None
+        if not user:
+            return None
+        msg = ChatMessage(thread_id=thread_id, sender_id=user.id, role=user.role, body=body)
+        session.add(msg)
+        session.commit()
+        return {
+            "id": msg.id,
+            "sender_id": user.id,
+            "sender": user.name,
+            "role": user.role.value,
+            "body": body,
+            "ts": int(msg.created_at.replace(tzinfo=timezone.utc).timestamp() * 1000),
+        }
+
+
 @router.websocket("/ws/chat/{thread_id}")
-async def websocket_chat(websocket: WebSocket, thread_id: int, session: Session = Depends(get_session)):
-    await manager.connect(thread_id, websocket)
-    try:
-        while True:
-            data = await websocket.receive_json()
-            user_id = data.get("user_id")
-            body = data.get("body", "")
-            user = session.get(User, user_id) if user_id else None
-            if not user:
-                await websocket.send_json({"error": "Unknown user"})
-                continue
-            msg = ChatMessage(thread_id=thread_id, sender_id=user.id, role=user.role, body=body)
-            session.add(msg)
-            session.commit()
-            session.refresh(msg)
-            await manager.broadcast(thread_id, {"sender": user.name, "role": user.role, "body": body})
-    except WebSocketDisconnect:
-        manager.disconnect(thread_id, websocket)
+async def websocket_chat(websocket: WebSocket, thread_id: int):
+    conn = await manager.connect(thread_id, websocket)
+
+    async def on_message(conn: Connection, data: dict) -> None:
+        event = await run_in_threadpool(_store_message, thread_id, data.get("user_id"), str(data.get("body", "")))
+        if event is None:
+            conn.push((ERROR, "Unknown user"))
+            return
+        manager.broadcast(thread_id, (MESSAGE, event))
+
+    await manager.serve(conn, on_message)
 
 
 @router.post("/ai", response_model=AIChatResponse)
 async def ai_chat(payload: AIChatRequest):
-    reply, provider = await ask_ai(payload.message, payload.syllabus_context)
+    reply, provider = await ask_ai(payload.message, payload.syllabus_context, payload.task)
     return AIChatResponse(reply=reply, provider=provider)
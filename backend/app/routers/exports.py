@@ -0,0 +1,41 @@
+import re
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..deps import require_role
+from ..gradebook import columnar_available, gradebook_query, stream_columnar, stream_csv
+from ..models import Role, User
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+@router.get("/gradebook")
+def export_gradebook(
+    class_id: str | None = None,
+    subject: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    format: Literal["csv", "parquet", "arrow"] = "csv",
+    _: User = Depends(require_role(Role.teacher, Role.admin)),
+):
+    if format != "csv" and not columnar_available():
+        raise HTTPException(status_code=400, detail=f"{format} export requires pyarrow on the server")
+    query = gradebook_query(class_id, subject, start, end)
+    body = stream_csv(query) if format == "csv" else stream_columnar(query, format)
+    # class_id comes from the query string; quotes or control characters would break the header.
+    label = re.sub(r"[^A-Za-z0-9_.-]", "_", class_id) if class_id else "all"
+    filename = f"gradebook-{label}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session, select
+
+from ..db import get_session
+from ..deps import get_current_user, require_role
+from ..jobs import cancel
+from ..models import Job, JobStatus, Role, User
+from ..schemas import JobOut
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_visible_job(job_id: int, session: Session, user: User) -> Job:
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if user.role != Role.admin and job.created_by != user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return job
+
+
+@router.get("/", response_model=list[JobOut])
+def list_jobs(
+    status: JobStatus | None = None,
+    kind: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    session: Session = Depends(get_session),
+    user: User = Depends(require_role(Role.teacher, Role.admin)),
+):
+    query = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status:
+        query = query.where(Job.status == status)
+    if kind:
+        query = query.where(Job.kind == kind)
+    if user.role != Role.admin:
+        query = query.where(Job.created_by == user.id)
+    return session.exec(query).all()
+
+
+@router.get("/{job_id}", response_model=JobOut)
+def get_job(job_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+    return _get_visible_job(job_id, session, user)
+
+
+@router.post("/{job_id}/cancel", response_model=JobOut)
+def cancel_job(job_id: int, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
+    job = _get_visible_job(job_id, session, user)
+    if not cancel(session, job):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    return job
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+
+from ..admission import admission
+from ..ai import ai_router
+from ..deps import get_admin
+from ..models import User
+from ..realtime import manager
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+def metrics(_: User = Depends(get_admin)):
+    return {"admission": admission.snapshot(), "websockets": manager.snapshot(), "ai": ai_router.snapshot()}
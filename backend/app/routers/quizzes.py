@@ -1,34 +1,93 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
+from ..adaptive import class_students, create_adaptive_quizzes
 from ..analytics import compute_weak_areas
-from ..db import get_session
-from ..deps import get_current_user, require_role
+from ..catalog_cache import QUIZZES, catalog_response
+from ..db import get_read_session, get_session
+from ..deps import get_token_data, require_role
+from ..item_analysis import quiz_item_analysis
 from ..models import Quiz, QuizAttempt, QuizQuestion, QuizResponse, Role, User, WeakArea
-from ..quiz import attach_questions
-from ..schemas import QuizAttemptCreate, QuizGenerateRequest, QuizOut, WeakAreaOut
+from ..jobs import enqueue
+from ..quiz import create_quiz
+from ..schemas import (
+    AdaptiveQuizOut,
+    AdaptiveQuizRequest,
+    ItemAnalysisOut,
+    JobOut,
+    QuizAttemptCreate,
+    QuizGenerateRequest,
+    QuizOut,
+    TokenData,
+    WeakAreaOut,
+)
+from ..serialization import dump_trusted, trusted_response
 
 router = APIRouter(prefix="/quizzes", tags=["quizzes"])
 
 
 @router.post("/generate", response_model=QuizOut)
 def generate_quiz(payload: QuizGenerateRequest, session: Session = Depends(get_session), _: User = Depends(require_role(Role.teacher, Role.admin))):
-    quiz = Quiz(class_id=payload.class_id, subject=payload.subject, generated_from={"topics": payload.topics})
-    quiz = attach_questions(quiz, payload.topics, payload.num_questions)
-    session.add(quiz)
-    session.commit()
-    session.refresh(quiz)
-    return quiz
+    return create_quiz(session, payload.class_id, payload.subject, payload.topics, payload.num_questions)
+
+
+@router.post("/generate/jobs", response_model=JobOut, status_code=202)
+def generate_quiz_async(payload: QuizGenerateRequest, session: Session = Depends(get_session), user: User = Depends(require_role(Role.teacher, Role.admin))):
+    return enqueue(session, "quiz.generate", payload.model_dump(), created_by=user.id)
+
+
+@router.post("/adaptive", response_model=list[AdaptiveQuizOut])
+def generate_adaptive(payload: AdaptiveQuizRequest, session: Session = Depends(get_session), user: User = Depends(require_role(Role.teacher, Role.admin, Role.student))):
+    student_ids = _adaptive_students(session, payload, user)
+    return create_adaptive_quizzes(session, payload.class_id, payload.subject, payload.topics, payload.num_questions, student_ids)
+
+
+@router.post("/adaptive/jobs", response_model=JobOut, status_code=202)
+def generate_adaptive_async(payload: AdaptiveQuizRequest, session: Session = Depends(get_session), user: User = Depends(require_role(Role.teacher, Role.admin, Role.student))):
+    body = payload.model_dump()
+    body["student_ids"] = _adaptive_students(session, payload, user)
+    return enqueue(session, "quiz.adaptive", body, created_by=user.id)
+
+
+def _adaptive_students(session: Session, payload: AdaptiveQuizRequest, user: User) -> list[int] | None:
+    # Students may only build their own quiz; staff default to the whole class.
+    if user.role == Role.student:
+        if payload.student_ids not in (None, [user.id]):
+            raise HTTPException(status_code=403, detail="Students can only request their own quiz")
+        if payload.class_id not in (user.classes or []):
+            raise HTTPException(status_code=403, detail="Students can only request quizzes for their own class")
+        return [user.id]
+    if payload.student_ids is not None:
+        outside = sorted(set(payload.student_ids) - set(class_students(session, payload.class_id)))
+        if outside:
+            raise HTTPException(status_code=400, detail=f"Not active students of {payload.class_id}: {outside}")
+    return payload.student_ids
 
 
 @router.get("/", response_model=list[QuizOut])
-def list_quizzes(class_id: str | None = None, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    query = select(Quiz)
-    if class_id:
-        query = query.where(Quiz.class_id == class_id)
-    return session.exec(query).all()
+def list_quizzes(
+    request: Request,
+    class_id: str | None = None,
+    session: Session = Depends(get_session),
+    token_data: TokenData = Depends(get_token_data),
+):
+    def load() -> bytes:
+        # Personalised quizzes belong to one student and are listed by /quizzes/mine instead.
+        query = select(Quiz).options(selectinload(Quiz.questions)).where(Quiz.owner_id.is_(None))
+        if class_id:
+            query = query.where(Quiz.class_id == class_id)
+        return dump_trusted(QuizOut, session.exec(query).all())
+
+    return catalog_response(request, session, token_data, QUIZZES, class_id, load)
+
+
+@router.get("/mine", response_model=list[QuizOut])
+def my_quizzes(session: Session = Depends(get_read_session), student: User = Depends(require_role(Role.student))):
+    query = select(Quiz).options(selectinload(Quiz.questions)).where(Quiz.owner_id == student.id).order_by(Quiz.id.desc())
+    return trusted_response(QuizOut, session.exec(query).all())
 
 
 @router.post("/{quiz_id}/attempts")
@@ -36,6 +95,8 @@ def attempt_quiz(quiz_id: int, payload: QuizAttemptCreate, session: Session = De
     quiz = session.get(Quiz, quiz_id)
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
+    if quiz.owner_id is not None and quiz.owner_id != student.id:
+        raise HTTPException(status_code=403, detail="This quiz belongs to another student")
     attempt = QuizAttempt(quiz_id=quiz_id, student_id=student.id, started_at=datetime.utcnow())
     session.add(attempt)
     session.commit()
@@ -61,6 +122,33 @@ def attempt_quiz(quiz_id: int, payload: QuizAttemptCreate, session: Session = De
     return {"attempt": attempt, "responses": responses}
 
 
+@router.get("/{quiz_id}/item-analysis", response_model=ItemAnalysisOut)
+def item_analysis(quiz_id: int, session: Session = Depends(get_read_session), _: User = Depends(require_role(Role.teacher, Role.admin))):
+    if not session.get(Quiz, quiz_id):
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    return quiz_item_analysis(session, quiz_id)
+
+
 @router.get("/analytics/weak-areas/{student_id}", response_model=list[WeakAreaOut])
-def weak_areas(student_id: int, session: Session = Depends(get_session), _: User = Depends(require_role(Role.teacher, Role.admin, Role.student))):
+def weak_areas(
+    student_id: int,
+    session: Session = Depends(get_session),
+    _: User = Depends(require_role(Role.teacher, Role.admin, Role.student)),
+):
     return compute_weak_areas(session, student_id)
+
+
+@router.post("/analytics/weak-areas/{student_id}/recompute", response_model=JobOut, status_code=202)
+def recompute_weak_areas(
+    student_id: int,
+    session: Session = Depends(get_session),
+    user: User = Depends(require_role(Role.teacher, Role.admin, Role.student)),
+):
+    # One recompute per student at a time: repeated requests return the active job.
+    return enqueue(
+        session,
+        "weak_areas.recompute",
+        {"student_id": student_id},
+        dedupe_key=f"weak-areas:{student_id}",
+        created_by=user.id,
+    )
@@ -1,12 +1,16 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
 
-from ..db import get_session
-from ..deps import get_current_user, require_role
+from ..catalog_cache import SYLLABUS, catalog_cache, catalog_response
+from ..db import get_read_session, get_session
+from ..deps import get_token_data, require_role
 from ..models import Role, SyllabusItem, User
-from ..schemas import SyllabusItemCreate, SyllabusItemOut, SyllabusItemUpdate
+from ..progress import apply_item_change, item_state, load_progress, rebuild_progress
+from ..schemas import SyllabusItemCreate, SyllabusItemOut, SyllabusItemUpdate, SyllabusProgressOut, TokenData
+from ..serialization import dump_trusted
 
 router = APIRouter(prefix="/syllabus", tags=["syllabus"])
 
@@ -21,17 +25,43 @@ def create_item(payload: SyllabusItemCreate, session: Session = Depends(get_sess
         teacher_id=teacher.id,
     )
     session.add(item)
+    apply_item_change(session, None, item_state(item))
+    catalog_cache.bump(session, SYLLABUS, item.class_id)
     session.commit()
     session.refresh(item)
     return item
 
 
 @router.get("/", response_model=list[SyllabusItemOut])
-def list_items(class_id: str | None = None, session: Session = Depends(get_session), user: User = Depends(get_current_user)):
-    query = select(SyllabusItem)
-    if class_id:
-        query = query.where(SyllabusItem.class_id == class_id)
-    return session.exec(query).all()
+def list_items(
+    request: Request,
+    class_id: str | None = None,
+    session: Session = Depends(get_session),
+    token_data: TokenData = Depends(get_token_data),
+):
+    def load() -> bytes:
+        query = select(SyllabusItem)
+        if class_id:
+            query = query.where(SyllabusItem.class_id == class_id)
+        return dump_trusted(SyllabusItemOut, session.exec(query).all())
+
+    return catalog_response(request, session, token_data, SYLLABUS, class_id, load)
+
+
+@router.get("/progress", response_model=list[SyllabusProgressOut])
+def progress(
+    class_id: str | None = None,
+    subject: str | None = None,
+    teacher_id: int | None = None,
+    session: Session = Depends(get_read_session),
+    _: User = Depends(require_role(Role.teacher, Role.admin)),
+):
+    return ORJSONResponse(load_progress(session, class_id, subject, teacher_id))
+
+
+@router.post("/progress/rebuild")
+def rebuild(session: Session = Depends(get_session), _: User = Depends(require_role(Role.admin))):
+    return {"rows": rebuild_progress(session)}
 
 
 @router.patch("/{item_id}", response_model=SyllabusItemOut)
@@ -39,11 +69,14 @@ def update_item(item_id: int, payload: SyllabusItemUpdate, session: Session = De
     item = session.get(SyllabusItem, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    for key, value in payload.dict(exclude_unset=True).items():
+    before = item_state(item)
+    for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, key, value)
     if payload.status == "completed" and not payload.completed_at:
         item.completed_at = datetime.utcnow()
     session.add(item)
+    apply_item_change(session, before, item_state(item))
+    catalog_cache.bump(session, SYLLABUS, item.class_id)
     session.commit()
     session.refresh(item)
     return item
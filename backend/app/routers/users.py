@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
-from ..db import get_session
+from ..db import get_read_session, get_session
 from ..deps import get_current_user, require_role
 from ..models import Role, User
 from ..schemas import UserCreate, UserOut, UserUpdate
+from ..serialization import trusted_response
 from ..security import hash_password
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -42,7 +43,7 @@ def create_user(payload: UserCreate, session: Session = Depends(get_session), _:
 def list_users(
     role: Role | None = None,
     department: str | None = None,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     current_user: User = Depends(get_current_user),
 ):
     query = select(User)
@@ -57,7 +58,7 @@ def list_users(
     elif current_user.role != Role.admin:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    return session.exec(query).all()
+    return trusted_response(UserOut, session.exec(query).all())
 
 
 @router.patch("/{user_id}", response_model=UserOut)
@@ -65,7 +66,7 @@ def update_user(user_id: int, payload: UserUpdate, session: Session = Depends(ge
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    for key, value in payload.dict(exclude_unset=True).items():
+    for key, value in payload.model_dump(exclude_unset=True).items():
         setattr(user, key, value)
     session.add(user)
     session.commit()
@@ -1,9 +1,9 @@
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
-from .models import ChangeStatus, ChatScope, Role
+from .models import ChangeStatus, ChatScope, JobStatus, Role
 
 
 class Token(BaseModel):
@@ -54,8 +54,7 @@ class UserOut(BaseModel):
     active: bool
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChangeRequestCreate(BaseModel):
@@ -77,8 +76,34 @@ class ChangeRequestOut(BaseModel):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeRequestDecision(BaseModel):
+    id: int
+    status: ChangeStatus
+    reviewer_note: Optional[str] = None
+
+
+class BulkReviewRequest(BaseModel):
+    decisions: List[ChangeRequestDecision] = Field(max_length=5000)
+
+
+class BulkReviewFailure(BaseModel):
+    id: int
+    reason: str
+    error: str
+
+
+class BulkReviewOut(BaseModel):
+    approved: List[int]
+    denied: List[int]
+    failed: List[BulkReviewFailure]
+
+
+class ChangeRequestPage(BaseModel):
+    items: List[ChangeRequestOut]
+    next_after_id: Optional[int]
 
 
 class SyllabusItemCreate(BaseModel):
@@ -104,8 +129,21 @@ class SyllabusItemOut(BaseModel):
     completed_at: Optional[datetime]
     teacher_id: Optional[int]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SyllabusProgressOut(BaseModel):
+    class_id: str
+    subject: str
+    teacher_id: Optional[int]
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    due_soon: int
+    completion_rate: Optional[float]
+    velocity_per_week: float
+    updated_at: datetime
 
 
 class QuizGenerateRequest(BaseModel):
@@ -115,6 +153,20 @@ class QuizGenerateRequest(BaseModel):
     num_questions: int = 5
 
 
+class AdaptiveQuizRequest(BaseModel):
+    class_id: str
+    subject: str
+    topics: List[str] = Field(default_factory=list)
+    num_questions: int = Field(5, ge=1)
+    student_ids: Optional[List[int]] = None
+
+
+class AdaptiveQuizOut(BaseModel):
+    student_id: int
+    quiz_id: int
+    topics: List[str]
+
+
 class QuizQuestionOut(BaseModel):
     id: int
     prompt: str
@@ -122,8 +174,7 @@ class QuizQuestionOut(BaseModel):
     explanation: str
     topic: Optional[str]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class QuizOut(BaseModel):
@@ -131,11 +182,11 @@ class QuizOut(BaseModel):
     class_id: str
     subject: str
     generated_from: dict[str, Any]
+    owner_id: Optional[int] = None
     created_at: datetime
     questions: List[QuizQuestionOut]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class QuizAttemptCreate(BaseModel):
@@ -150,8 +201,7 @@ class QuizAttemptOut(BaseModel):
     submitted_at: Optional[datetime]
     score: Optional[float]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WeakAreaOut(BaseModel):
@@ -162,8 +212,31 @@ class WeakAreaOut(BaseModel):
     evidence: dict[str, Any]
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ItemStatsOut(BaseModel):
+    question_id: int
+    topic: str
+    p_value: Optional[float]
+    discrimination: Optional[float]
+    distractors: dict[str, int]
+    blank_or_other: int
+    flags: List[str]
+
+
+class TopicReliabilityOut(BaseModel):
+    topic: str
+    items: int
+    kr20: Optional[float]
+
+
+class ItemAnalysisOut(BaseModel):
+    quiz_id: int
+    attempts: int
+    kr20: Optional[float]
+    items: List[ItemStatsOut]
+    topics: List[TopicReliabilityOut]
 
 
 class ChatThreadCreate(BaseModel):
@@ -179,8 +252,7 @@ class ChatThreadOut(BaseModel):
     audience: dict[str, Any]
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ChatMessageCreate(BaseModel):
@@ -195,15 +267,36 @@ class ChatMessageOut(BaseModel):
     body: str
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class AIChatRequest(BaseModel):
     message: str
     syllabus_context: Optional[list[str]] = None
+    task: Literal["chat", "quiz"] = "chat"
 
 
 class AIChatResponse(BaseModel):
     reply: str
     provider: str
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    priority: int
+    payload: dict[str, Any]
+    result: Optional[dict[str, Any]]
+    error: Optional[str]
+    dedupe_key: Optional[str]
+    attempts: int
+    max_attempts: int
+    progress: float
+    progress_note: Optional[str]
+    created_by: Optional[int]
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
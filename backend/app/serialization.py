@@ -0,0 +1,71 @@
+import types
+import typing
+from collections.abc import Callable, Iterable
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+RowDumper = Callable[[Any], dict[str, Any]]
+
+
+def _nested_model(annotation: Any) -> tuple[type[BaseModel] | None, bool]:
+    """Return (model, is_list) when a field holds another schema, e.g. ``List[QuizQuestionOut]``."""
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        (item,) = typing.get_args(annotation) or (None,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return item, True
+    if origin in (typing.Union, types.UnionType):
+        for arg in typing.get_args(annotation):
+            model, is_list = _nested_model(arg)
+            if model:
+                return model, is_list
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def row_dumper(model: type[BaseModel]) -> RowDumper:
+    """Build (once per schema) a function that copies exactly the schema's fields off an ORM row."""
+    plain: list[str] = []
+    nested: list[tuple[str, RowDumper, bool]] = []
+    for name, field in model.model_fields.items():
+        sub_model, is_list = _nested_model(field.annotation)
+        if sub_model is None:
+            plain.append(name)
+        else:
+            nested.append((name, row_dumper(sub_model), is_list))
+
+    def dump(row: Any) -> dict[str, Any]:
+        data = {name: getattr(row, name) for name in plain}
+        for name, sub_dump, is_list in nested:
+            value = getattr(row, name)
+            if value is None:
+                data[name] = None
+            elif is_list:
+                data[name] = [sub_dump(item) for item in value]
+            else:
+                data[name] = sub_dump(value)
+        return data
+
+    return dump
+
+
+def dump_trusted(model: type[BaseModel], rows: Iterable[Any]) -> bytes:
+    """Serialize ORM rows we loaded ourselves without re-validating them through ``model``.
+
+    Only the fields declared on the schema are emitted, so private columns such as
+    ``password_hash`` or ``QuizQuestion.answer`` stay out of the payload.
+    """
+    dump = row_dumper(model)
+    return orjson.dumps([dump(row) for row in rows])
+
+
+def trusted_response(model: type[BaseModel], rows: Iterable[Any], **kwargs: Any) -> Response:
+    # Returning a Response bypasses FastAPI's response_model validation; the
+    # route keeps response_model for the OpenAPI schema.
+    return Response(content=dump_trusted(model, rows), media_type=ORJSONResponse.media_type, **kwargs)
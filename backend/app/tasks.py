@@ -0,0 +1,45 @@
+"""Job handlers for work that should not run on the request path."""
+
+from typing import Any
+
+from .adaptive import create_adaptive_quizzes
+from .analytics import compute_weak_areas
+from .archive import run_archival
+from .jobs import JobContext, job_handler
+from .quiz import create_quiz
+
+
+@job_handler("quiz.generate")
+def generate_quiz_job(ctx: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    quiz = create_quiz(
+        ctx.session,
+        payload["class_id"],
+        payload["subject"],
+        payload.get("topics") or [],
+        payload.get("num_questions", 5),
+    )
+    return {"quiz_id": quiz.id}
+
+
+@job_handler("quiz.adaptive")
+def adaptive_quizzes_job(ctx: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    created = create_adaptive_quizzes(
+        ctx.session,
+        payload["class_id"],
+        payload["subject"],
+        payload.get("topics") or [],
+        payload.get("num_questions", 5),
+        payload.get("student_ids"),
+    )
+    return {"quizzes": created}
+
+
+@job_handler("weak_areas.recompute")
+def recompute_weak_areas_job(ctx: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    weak_areas = compute_weak_areas(ctx.session, payload["student_id"])
+    return {"student_id": payload["student_id"], "topics": [wa.topic for wa in weak_areas]}
+
+
+@job_handler("archive.run")
+def archive_job(ctx: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    return run_archival(ctx.session)
@@ -0,0 +1,4 @@
+"""Reproducible load tests: synthetic seed data, scenario drivers and JSON reports.
+
+Run from ``backend/`` with ``python -m bench run``; see ``bench/__main__.py``.
+"""
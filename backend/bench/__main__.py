@@ -0,0 +1,144 @@
+"""Command line entry point.
+
+    python -m bench run --scale small --target inprocess --out bench-results/run.json
+    python -m bench compare bench-results/base.json bench-results/run.json --threshold 0.15
+
+``run`` seeds a fresh database (a temporary SQLite file unless ``--db-url`` is
+given), drives the selected scenarios and writes a JSON report. ``compare``
+prints per-metric deltas and exits non-zero when any metric regressed.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from .harness import compare_results, configure_environment, write_results
+
+SCENARIO_NAMES = ["login_burst", "submit_storm", "weak_area_reads", "list_endpoints", "catalog_polling", "read_during_write_storm", "gradebook_export", "websockets", "serialization", "item_analysis", "adaptive_cohort", "syllabus_progress", "admission_control", "bulk_review", "archival", "ai_batching"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m bench", description="Load tests for the learning system API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="seed a database and run scenarios")
+    run.add_argument("--scale", default="small", choices=["tiny", "small", "medium", "large"])
+    run.add_argument("--seed", type=int, default=1234)
+    run.add_argument("--target", default="inprocess", choices=["inprocess", "uvicorn"])
+    run.add_argument("--base-url", help="drive an already running server instead (must share DB_URL/JWT_SECRET)")
+    run.add_argument("--db-url", help="database to seed; defaults to a fresh temporary SQLite file")
+    run.add_argument("--scenarios", default=",".join(SCENARIO_NAMES), help="comma separated subset")
+    run.add_argument("--requests", type=int, default=200, help="requests per HTTP scenario")
+    run.add_argument("--concurrency", type=int, default=32)
+    run.add_argument("--ws-clients", type=int, default=12)
+    run.add_argument("--ws-messages", type=int, default=10)
+    run.add_argument("--ws-protocol", default="chat.v2.json", choices=["chat.v2.json", "chat.v2.msgpack", "legacy"])
+    run.add_argument("--out", default="bench-results/latest.json")
+
+    compare = sub.add_parser("compare", help="flag regressions between two result files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (0.10 = 10%%)")
+    return parser
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    db_url = args.db_url or f"sqlite:///{Path(tempfile.mkdtemp(prefix='lls-bench-')) / 'bench.db'}"
+    configure_environment(db_url, jwt_secret="bench-secret")
+
+    # Imported late: the app reads its settings at import time.
+    from sqlmodel import Session, select
+
+    from app.db import engine, init_db
+    from app.main import app, ensure_admin
+    from app.models import Role, User
+
+    from .harness import InProcessTarget, RemoteTarget, UvicornTarget, run_metadata
+    from .scenarios import SCENARIOS, BenchContext
+    from .seed import SCALES, seed_database
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"unknown scenarios: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    init_db()
+    ensure_admin()
+    config = replace(SCALES[args.scale], seed=args.seed)
+    with Session(engine) as session:
+        data = seed_database(session, config)
+        admin_id = session.exec(select(User.id).where(User.role == Role.admin)).first()
+    print(f"seeded {db_url}: {json.dumps(data.counts)}")
+
+    if args.base_url:
+        target = RemoteTarget(args.base_url)
+    elif args.target == "uvicorn":
+        target = UvicornTarget(app)
+    else:
+        target = InProcessTarget(app)
+
+    ctx = BenchContext(
+        target=target,
+        app=app,
+        data=data,
+        rng=random.Random(args.seed),
+        admin_id=admin_id,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        ws_clients=args.ws_clients,
+        ws_messages=args.ws_messages,
+        ws_protocol=args.ws_protocol,
+    )
+    report = {"meta": run_metadata(target, args.scale, args.seed, data.counts), "scenarios": {}}
+    report["meta"]["params"] = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "ws_clients": args.ws_clients,
+        "ws_messages": args.ws_messages,
+        "ws_protocol": args.ws_protocol,
+    }
+    try:
+        for name in names:
+            result = asyncio.run(SCENARIOS[name](ctx))
+            summary = result.summary()
+            report["scenarios"][name] = summary
+            latency = summary.get("latency_ms", {})
+            print(
+                f"{name:<18} n={summary['count']:<6} err={summary['errors']:<4} "
+                f"rps={summary['throughput_rps']:<9} p50={latency.get('p50', '-')}ms p95={latency.get('p95', '-')}ms"
+            )
+    finally:
+        target.close()
+
+    write_results(args.out, report)
+    print(f"wrote {args.out}")
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.current) as fh:
+        current = json.load(fh)
+    rows = compare_results(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        print(f"{row['scenario']:<18} {row['metric']:<15} {row['baseline']:>12} -> {row['current']:<12} {row['change']:+.1%}  {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return cmd_run(args)
+    return cmd_compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""A stand-in for an OpenAI-compatible local inference server.
+
+It models a single CPU-bound model: calls are served one at a time, and a call
+costs a fixed setup time plus a smaller amount per prompt, so batching pays
+off the way it does on llama.cpp/vLLM. Replies echo the user's message.
+"""
+
+import asyncio
+from collections import Counter
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+CALL_MS = 40.0
+PROMPT_MS = 4.0
+
+
+def build_app(call_ms: float = CALL_MS, prompt_ms: float = PROMPT_MS) -> Starlette:
+    model = asyncio.Lock()
+    stats: Counter[str] = Counter()
+
+    async def infer(prompts: list[str]) -> list[str]:
+        async with model:
+            stats["calls"] += 1
+            stats["prompts"] += len(prompts)
+            await asyncio.sleep((call_ms + prompt_ms * len(prompts)) / 1000)
+        return [f"Stand-in answer to: {_user_line(prompt)}"[:200] for prompt in prompts]
+
+    async def completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        prompts = body["prompt"] if isinstance(body["prompt"], list) else [body["prompt"]]
+        texts = await infer(prompts)
+        return JSONResponse({"object": "text_completion", "model": body.get("model"), "choices": [{"index": n, "text": text} for n, text in enumerate(texts)]})
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        (text,) = await infer([body["messages"][-1]["content"]])
+        return JSONResponse({"object": "chat.completion", "choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]})
+
+    app = Starlette(
+        routes=[
+            Route("/v1/completions", completions, methods=["POST"]),
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+        ]
+    )
+    app.state.stats = stats
+    return app
+
+
+def _user_line(prompt: str) -> str:
+    return next((line[len("User: ") :] for line in prompt.splitlines() if line.startswith("User: ")), prompt)
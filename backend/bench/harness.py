@@ -0,0 +1,248 @@
+"""Targets, timing and result bookkeeping shared by the benchmark scenarios."""
+
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+
+
+def configure_environment(db_url: str, jwt_secret: str) -> None:
+    """Must run before anything under ``app`` is imported: settings and engine are module globals."""
+    os.environ["DB_URL"] = db_url
+    os.environ.setdefault("JWT_SECRET", jwt_secret)
+    # Scenarios flood the API on purpose; admission_control switches limits back on.
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # The archival scenario writes segment files; keep them out of the working tree.
+    os.environ.setdefault("ARCHIVE_DIR", tempfile.mkdtemp(prefix="lls-archive-"))
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    duration_s: float = 0.0
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        count = len(lat)
+        data: dict[str, Any] = {
+            "count": count,
+            "errors": self.errors,
+            "duration_s": round(self.duration_s, 4),
+            "throughput_rps": round(count / self.duration_s, 2) if self.duration_s else 0.0,
+        }
+        if lat:
+            data["latency_ms"] = {
+                "min": round(lat[0], 3),
+                "mean": round(statistics.fmean(lat), 3),
+                "p50": round(_percentile(lat, 50), 3),
+                "p90": round(_percentile(lat, 90), 3),
+                "p95": round(_percentile(lat, 95), 3),
+                "p99": round(_percentile(lat, 99), 3),
+                "max": round(lat[-1], 3),
+            }
+        data.update(self.extra)
+        return data
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+async def run_concurrently(
+    result: ScenarioResult,
+    calls: list[Callable[[], Awaitable[httpx.Response]]],
+    concurrency: int,
+) -> ScenarioResult:
+    """Run ``calls`` with at most ``concurrency`` in flight; anything but 2xx/304 counts as an error."""
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: dict[str, int] = {}
+
+    async def timed(call: Callable[[], Awaitable[httpx.Response]]) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = str((await call()).status_code)
+            except Exception as exc:
+                status = type(exc).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            statuses[status] = statuses.get(status, 0) + 1
+            if status.startswith("2") or status == "304":
+                result.latencies_ms.append(elapsed)
+            else:
+                result.errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(call) for call in calls))
+    result.duration_s = time.perf_counter() - started
+    result.extra["status_counts"] = statuses
+    return result
+
+
+class Target:
+    """Where requests go. ``base_url`` is None for the in-process ASGI transport."""
+
+    name = "base"
+    base_url: str | None = None
+
+    def client(self) -> httpx.AsyncClient:
+        raise NotImplementedError
+
+    def ws_url(self, path: str) -> str | None:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class InProcessTarget(Target):
+    name = "inprocess"
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    def client(self) -> httpx.AsyncClient:
+        transport = httpx.ASGITransport(app=self.app)
+        return httpx.AsyncClient(transport=transport, base_url="http://bench.local", timeout=60)
+
+
+class UvicornTarget(Target):
+    """Serves the app with a real uvicorn server on a free loopback port in a background thread."""
+
+    name = "uvicorn"
+
+    def __init__(self, app) -> None:
+        import uvicorn
+
+        port = _free_port()
+        self.base_url = f"http://127.0.0.1:{port}"
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + 15
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.05)
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+        return httpx.AsyncClient(base_url=self.base_url, timeout=60, limits=limits)
+
+    def ws_url(self, path: str) -> str:
+        return self.base_url.replace("http://", "ws://") + path
+
+    def close(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+class RemoteTarget(Target):
+    """An already running server; it must share ``DB_URL`` and ``JWT_SECRET`` with the bench process."""
+
+    name = "remote"
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url.rstrip("/")
+
+    def client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+        return httpx.AsyncClient(base_url=self.base_url, timeout=60, limits=limits)
+
+    def ws_url(self, path: str) -> str:
+        return self.base_url.replace("http://", "ws://").replace("https://", "wss://") + path
+
+
+@asynccontextmanager
+async def open_client(target: Target):
+    client = target.client()
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_metadata(target: Target, scale: str, seed: int, counts: dict[str, int]) -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": target.name,
+        "scale": scale,
+        "seed": seed,
+        "dataset": counts,
+    }
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def write_results(path: str, payload: dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+
+
+def compare_results(baseline: dict[str, Any], current: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """Return one row per scenario metric; ``regression`` is set when it is worse by more than ``threshold``."""
+    rows: list[dict[str, Any]] = []
+    for name, cur in current.get("scenarios", {}).items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for metric, higher_is_better in (("throughput_rps", True), ("latency_ms.p95", False), ("errors", False)):
+            old, new = _metric(base, metric), _metric(cur, metric)
+            if old is None or new is None:
+                continue
+            if old == 0:
+                change = 0.0 if new == 0 else float("inf")
+            else:
+                change = (new - old) / old
+            worse = -change if higher_is_better else change
+            regression = worse > threshold if metric != "errors" else new > old
+            rows.append({"scenario": name, "metric": metric, "baseline": old, "current": new, "change": change, "regression": regression})
+    return rows
+
+
+def _metric(data: dict[str, Any], dotted: str) -> float | None:
+    value: Any = data
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
@@ -0,0 +1,892 @@
+"""Scenario drivers. Each one issues real HTTP/WebSocket traffic against a :class:`Target`."""
+
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import httpx
+
+from app.config import get_settings
+from app.models import Role
+from app.security import create_access_token
+
+from .harness import RemoteTarget, ScenarioResult, Target, UvicornTarget, open_client, run_concurrently
+from .seed import BENCH_PASSWORD, SeedResult
+
+settings = get_settings()
+API = settings.api_prefix
+SETTLE_S = 0.2
+ADMISSION_RETRIES = 50
+ADMISSION_RETRY_S = 0.02
+
+
+@dataclass
+class BenchContext:
+    target: Target
+    app: object
+    data: SeedResult
+    rng: random.Random
+    admin_id: int
+    requests: int = 200
+    concurrency: int = 32
+    ws_clients: int = 12
+    ws_messages: int = 10
+    ws_protocol: str = "chat.v2.json"
+
+    def token_for(self, user_id: int, role: Role) -> str:
+        # Minted directly so only the login scenario pays for bcrypt.
+        return create_access_token({"sub": str(user_id), "role": role})
+
+    def auth(self, user_id: int, role: Role) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token_for(user_id, role)}"}
+
+
+Scenario = Callable[[BenchContext], Awaitable[ScenarioResult]]
+
+
+async def login_burst(ctx: BenchContext) -> ScenarioResult:
+    result = ScenarioResult("login_burst")
+    users = ctx.data.student_ids + ctx.data.teacher_ids
+    async with open_client(ctx.target) as client:
+
+        def call(user_id: int):
+            async def go() -> httpx.Response:
+                form = {"username": ctx.data.email_for(user_id), "password": BENCH_PASSWORD}
+                return await client.post(f"{API}/auth/login", data=form)
+
+            return go
+
+        calls = [call(ctx.rng.choice(users)) for _ in range(ctx.requests)]
+        return await run_concurrently(result, calls, ctx.concurrency)
+
+
+async def submit_storm(ctx: BenchContext) -> ScenarioResult:
+    """Every student of every class submits an attempt for one of their class quizzes at once."""
+    result = ScenarioResult("submit_storm")
+    async with open_client(ctx.target) as client:
+
+        def call(student_id: int, quiz_id: int):
+            key = ctx.data.answer_keys[quiz_id]
+            answers = {str(qid): (answer if ctx.rng.random() < 0.7 else "wrong") for qid, answer in key.items()}
+            headers = ctx.auth(student_id, Role.student)
+
+            async def go() -> httpx.Response:
+                return await client.post(f"{API}/quizzes/{quiz_id}/attempts", json={"answers": answers}, headers=headers)
+
+            return go
+
+        calls = []
+        for class_id, students in ctx.data.students_by_class.items():
+            quizzes = ctx.data.quiz_ids_by_class.get(class_id) or []
+            if not quizzes:
+                continue
+            for student_id in students:
+                calls.append(call(student_id, ctx.rng.choice(quizzes)))
+        calls = calls[: max(ctx.requests, 1)]
+        result.extra["submissions"] = len(calls)
+        return await run_concurrently(result, calls, ctx.concurrency)
+
+
+async def weak_area_reads(ctx: BenchContext) -> ScenarioResult:
+    result = ScenarioResult("weak_area_reads")
+    teacher = ctx.data.teacher_ids[0]
+    headers = ctx.auth(teacher, Role.teacher)
+    async with open_client(ctx.target) as client:
+
+        def call(student_id: int):
+            async def go() -> httpx.Response:
+                return await client.get(f"{API}/quizzes/analytics/weak-areas/{student_id}", headers=headers)
+
+            return go
+
+        calls = [call(ctx.rng.choice(ctx.data.student_ids)) for _ in range(ctx.requests)]
+        return await run_concurrently(result, calls, ctx.concurrency)
+
+
+async def list_endpoints(ctx: BenchContext) -> ScenarioResult:
+    result = ScenarioResult("list_endpoints")
+    admin_headers = ctx.auth(ctx.admin_id, Role.admin)
+    teacher_headers = ctx.auth(ctx.data.teacher_ids[0], Role.teacher)
+    student_headers = ctx.auth(ctx.data.student_ids[0], Role.student)
+    per_path: dict[str, int] = {}
+    async with open_client(ctx.target) as client:
+
+        def call(path: str, headers: dict[str, str]):
+            async def go() -> httpx.Response:
+                return await client.get(path, headers=headers)
+
+            return go
+
+        calls = []
+        for _ in range(ctx.requests):
+            class_id = ctx.rng.choice(ctx.data.class_ids)
+            path, headers = ctx.rng.choice(
+                [
+                    (f"{API}/syllabus/?class_id={class_id}", student_headers),
+                    (f"{API}/quizzes/?class_id={class_id}", student_headers),
+                    (f"{API}/users/?role=student", teacher_headers),
+                    (f"{API}/chat/threads", student_headers),
+                    (f"{API}/change-requests/", admin_headers),
+                ]
+            )
+            route = path.split("?")[0]
+            per_path[route] = per_path.get(route, 0) + 1
+            calls.append(call(path, headers))
+        result.extra["requests_by_route"] = per_path
+        return await run_concurrently(result, calls, ctx.concurrency)
+
+
+async def catalog_polling(ctx: BenchContext) -> ScenarioResult:
+    """Students re-polling class catalogs with If-None-Match, as a dashboard would."""
+    result = ScenarioResult("catalog_polling")
+    headers = ctx.auth(ctx.data.student_ids[0], Role.student)
+    not_modified = 0
+    async with open_client(ctx.target) as client:
+        etags: dict[str, str] = {}
+        for class_id in ctx.data.class_ids:
+            for kind in ("syllabus", "quizzes"):
+                path = f"{API}/{kind}/?class_id={class_id}"
+                resp = await client.get(path, headers=headers)
+                etags[path] = resp.headers.get("etag", "")
+
+        def call(path: str):
+            async def go() -> httpx.Response:
+                nonlocal not_modified
+                resp = await client.get(path, headers={**headers, "If-None-Match": etags[path]})
+                not_modified += resp.status_code == 304
+                return resp
+
+            return go
+
+        paths = list(etags)
+        calls = [call(ctx.rng.choice(paths)) for _ in range(ctx.requests)]
+        await run_concurrently(result, calls, ctx.concurrency)
+    result.extra["not_modified"] = not_modified
+    return result
+
+
+async def read_during_write_storm(ctx: BenchContext) -> ScenarioResult:
+    """Read throughput alone vs. while quiz submissions hammer the writer."""
+    result = ScenarioResult("read_during_write_storm")
+    teacher_headers = ctx.auth(ctx.data.teacher_ids[0], Role.teacher)
+    student_headers = ctx.auth(ctx.data.student_ids[0], Role.student)
+    # Uncached, database-backed reads.
+    reads = [(f"{API}/users/?role=student", teacher_headers), (f"{API}/chat/threads", student_headers)]
+    submissions = [
+        (student_id, ctx.rng.choice(ctx.data.quiz_ids_by_class[class_id]))
+        for class_id, students in ctx.data.students_by_class.items()
+        if ctx.data.quiz_ids_by_class.get(class_id)
+        for student_id in students
+    ]
+
+    async with open_client(ctx.target) as client:
+
+        def read_call(path: str, headers: dict[str, str]):
+            async def go() -> httpx.Response:
+                return await client.get(path, headers=headers)
+
+            return go
+
+        def write_call(student_id: int, quiz_id: int):
+            answers = {str(qid): answer for qid, answer in ctx.data.answer_keys[quiz_id].items()}
+            headers = ctx.auth(student_id, Role.student)
+
+            async def go() -> httpx.Response:
+                return await client.post(f"{API}/quizzes/{quiz_id}/attempts", json={"answers": answers}, headers=headers)
+
+            return go
+
+        def read_calls() -> list:
+            return [read_call(*ctx.rng.choice(reads)) for _ in range(ctx.requests)]
+
+        baseline = await run_concurrently(ScenarioResult("reads_alone"), read_calls(), ctx.concurrency)
+        writes = ScenarioResult("writes")
+        write_calls = [write_call(*ctx.rng.choice(submissions)) for _ in range(ctx.requests)]
+        storm = asyncio.ensure_future(run_concurrently(writes, write_calls, ctx.concurrency))
+        under_load = await run_concurrently(result, read_calls(), ctx.concurrency)
+        await storm
+
+    alone = baseline.summary()
+    loaded = under_load.summary()
+    write_summary = writes.summary()
+    result.extra.update(
+        {
+            "reads_alone": {k: alone.get(k) for k in ("throughput_rps", "errors", "latency_ms")},
+            "writes": {k: write_summary.get(k) for k in ("count", "throughput_rps", "errors", "status_counts")},
+            "read_throughput_ratio": _ratio(loaded["throughput_rps"], alone["throughput_rps"]),
+            # In one Python process reads and writes share a CPU, so reads alone can't hold 1.0;
+            # a combined ratio near 1.0 means nothing is stalled waiting on database locks.
+            "combined_throughput_ratio": _ratio(loaded["throughput_rps"] + write_summary["throughput_rps"], alone["throughput_rps"]),
+        }
+    )
+    return result
+
+
+async def gradebook_export(ctx: BenchContext) -> ScenarioResult:
+    """Stream the full gradebook in each format and record peak RSS growth of this process.
+
+    Use ``--target uvicorn`` for the memory figure: httpx's ASGI transport buffers
+    whole response bodies, which would hide the server's streaming behaviour.
+    """
+    import resource
+
+    result = ScenarioResult("gradebook_export")
+    headers = ctx.auth(ctx.admin_id, Role.admin)
+    by_format: dict[str, dict] = {}
+    started = time.perf_counter()
+    async with open_client(ctx.target) as client:
+        for fmt in ("csv", "parquet", "arrow"):
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            begin = time.perf_counter()
+            size = 0
+            async with client.stream("GET", f"{API}/exports/gradebook?format={fmt}", headers=headers) as resp:
+                if resp.status_code != 200:
+                    result.errors += 1
+                    by_format[fmt] = {"status": resp.status_code}
+                    continue
+                async for chunk in resp.aiter_bytes():
+                    size += len(chunk)
+            elapsed = time.perf_counter() - begin
+            result.latencies_ms.append(elapsed * 1000)
+            by_format[fmt] = {
+                "seconds": round(elapsed, 3),
+                "bytes": size,
+                "rows_per_s": round(ctx.data.counts["responses"] / elapsed) if elapsed else None,
+                "peak_rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+            }
+    result.duration_s = time.perf_counter() - started
+    result.extra.update({"rows": ctx.data.counts["responses"], "formats": by_format})
+    return result
+
+
+async def websockets_fanout(ctx: BenchContext) -> ScenarioResult:
+    """N sockets spread over the class threads; each sends M messages and waits for the full fan-out."""
+    result = ScenarioResult("websockets")
+    threads = [tid for tids in ctx.data.thread_ids_by_class.values() for tid in tids]
+    senders = ctx.data.student_ids
+    plan = [(threads[i % len(threads)], senders[i % len(senders)]) for i in range(ctx.ws_clients)]
+    per_thread: dict[int, int] = {}
+    for thread_id, _ in plan:
+        per_thread[thread_id] = per_thread.get(thread_id, 0) + 1
+    expected = {thread_id: count * ctx.ws_messages for thread_id, count in per_thread.items()}
+
+    started = time.perf_counter()
+    if ctx.target.ws_url("/") is None:
+        stats = await asyncio.to_thread(_ws_inprocess, ctx, plan, expected)
+    else:
+        stats = await _ws_network(ctx, plan, expected)
+    result.duration_s = time.perf_counter() - started
+    result.latencies_ms = stats["latencies"]
+    result.errors = stats["errors"]
+    result.extra.update(
+        {
+            "clients": ctx.ws_clients,
+            "messages_per_client": ctx.ws_messages,
+            "protocol": ctx.ws_protocol,
+            "frames_expected": sum(expected[thread_id] for thread_id, _ in plan),
+            "frames_delivered": stats["frames"],
+            "wire_frames": stats["wire_frames"],
+            "messages_per_wire_frame": _ratio(stats["frames"], stats["wire_frames"]),
+            "payload_bytes": stats["bytes"],
+            "deflated_bytes": stats["deflated"],
+            "connect_ms_p95": _p95(stats["connect"]),
+        }
+    )
+    return result
+
+
+def _ratio(numerator: float, denominator: float) -> float | None:
+    return round(numerator / denominator, 3) if denominator else None
+
+
+def _p95(values: list[float]) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3)
+
+
+def _frame(socket_no: int, seq: int, user_id: int, protocol: str) -> str | bytes:
+    message = {"user_id": user_id, "body": json.dumps({"s": socket_no, "n": seq, "t": time.perf_counter()})}
+    if protocol == "chat.v2.msgpack":
+        import msgpack
+
+        return msgpack.packb(message)
+    return json.dumps(message)
+
+
+def _deflated_size(compressor, data: str | bytes) -> int:
+    """Size of ``data`` as a permessage-deflate frame (RFC 7692, context takeover) on this socket's compressor."""
+    raw = data.encode() if isinstance(data, str) else data
+    return len(compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH)) - 4
+
+
+def _ws_messages(protocol: str, data: str | bytes) -> list[dict]:
+    """Chat messages in one received frame: the frame itself for the legacy protocol, its ``messages`` for v2."""
+    if protocol == "legacy":
+        return [json.loads(data)]
+    if protocol == "chat.v2.msgpack":
+        import msgpack
+
+        return msgpack.unpackb(data).get("messages", [])
+    return json.loads(data).get("messages", [])
+
+
+def _own_latency(message: dict, socket_no: int) -> float | None:
+    try:
+        body = json.loads(message.get("body", ""))
+    except (TypeError, ValueError):
+        return None
+    if body.get("s") != socket_no:
+        return None
+    return (time.perf_counter() - body["t"]) * 1000
+
+
+def _ws_inprocess(ctx: BenchContext, plan: list[tuple[int, int]], expected: dict[int, int]) -> dict:
+    from fastapi.testclient import TestClient
+
+    stats = {"latencies": [], "errors": 0, "frames": 0, "wire_frames": 0, "bytes": 0, "deflated": 0, "connect": []}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(plan))
+    subprotocols = [] if ctx.ws_protocol == "legacy" else [ctx.ws_protocol]
+
+    with TestClient(ctx.app) as client:
+
+        def worker(socket_no: int, thread_id: int, user_id: int) -> None:
+            latencies: list[float] = []
+            frames = wire_frames = size = deflated = 0
+            compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+            begin = time.perf_counter()
+            try:
+                with client.websocket_connect(f"{API}/chat/ws/chat/{thread_id}", subprotocols=subprotocols) as ws:
+                    connect_ms = (time.perf_counter() - begin) * 1000
+                    barrier.wait()
+                    time.sleep(SETTLE_S)
+                    for seq in range(ctx.ws_messages):
+                        frame = _frame(socket_no, seq, user_id, ctx.ws_protocol)
+                        if isinstance(frame, bytes):
+                            ws.send_bytes(frame)
+                        else:
+                            ws.send_text(frame)
+                    while frames < expected[thread_id]:
+                        received = ws.receive()
+                        data = received.get("text") if received.get("text") is not None else received.get("bytes")
+                        if data is None:
+                            raise RuntimeError("socket closed")
+                        wire_frames += 1
+                        size += len(data)
+                        deflated += _deflated_size(compressor, data)
+                        for message in _ws_messages(ctx.ws_protocol, data):
+                            frames += 1
+                            latency = _own_latency(message, socket_no)
+                            if latency is not None:
+                                latencies.append(latency)
+                    with lock:
+                        stats["connect"].append(connect_ms)
+            except Exception:
+                with lock:
+                    stats["errors"] += 1
+                barrier.abort()
+            with lock:
+                stats["latencies"].extend(latencies)
+                stats["frames"] += frames
+                stats["wire_frames"] += wire_frames
+                stats["bytes"] += size
+                stats["deflated"] += deflated
+
+        workers = [threading.Thread(target=worker, args=(n, tid, uid), daemon=True) for n, (tid, uid) in enumerate(plan)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    return stats
+
+
+async def _ws_network(ctx: BenchContext, plan: list[tuple[int, int]], expected: dict[int, int]) -> dict:
+    import websockets
+
+    stats = {"latencies": [], "errors": 0, "frames": 0, "wire_frames": 0, "bytes": 0, "deflated": 0, "connect": []}
+    subprotocols = None if ctx.ws_protocol == "legacy" else [ctx.ws_protocol]
+    connections = []
+    for socket_no, (thread_id, user_id) in enumerate(plan):
+        begin = time.perf_counter()
+        try:
+            # permessage-deflate is offered by default and accepted by uvicorn.
+            ws = await websockets.connect(
+                ctx.target.ws_url(f"{API}/chat/ws/chat/{thread_id}"), max_queue=None, subprotocols=subprotocols
+            )
+        except Exception:
+            stats["errors"] += 1
+            continue
+        stats["connect"].append((time.perf_counter() - begin) * 1000)
+        connections.append((socket_no, thread_id, user_id, ws))
+    # The server registers a socket just after the handshake completes; let the last ones land.
+    await asyncio.sleep(SETTLE_S)
+
+    async def drive(socket_no: int, thread_id: int, user_id: int, ws) -> None:
+        frames = 0
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        try:
+            for seq in range(ctx.ws_messages):
+                await ws.send(_frame(socket_no, seq, user_id, ctx.ws_protocol))
+            while frames < expected[thread_id]:
+                data = await asyncio.wait_for(ws.recv(), timeout=5)
+                stats["wire_frames"] += 1
+                stats["bytes"] += len(data)
+                stats["deflated"] += _deflated_size(compressor, data)
+                for message in _ws_messages(ctx.ws_protocol, data):
+                    frames += 1
+                    latency = _own_latency(message, socket_no)
+                    if latency is not None:
+                        stats["latencies"].append(latency)
+        except Exception:
+            # Includes timing out on frames that never arrived.
+            stats["errors"] += 1
+        finally:
+            stats["frames"] += frames
+            await ws.close()
+
+    await asyncio.gather(*(drive(*conn) for conn in connections))
+    return stats
+
+
+async def serialization(ctx: BenchContext) -> ScenarioResult:
+    """Time the response encoding paths on the full quiz catalog (quizzes with nested questions)."""
+    from pydantic import TypeAdapter
+    from sqlalchemy.orm import selectinload
+    from sqlmodel import Session, select
+
+    from app.db import engine
+    from app.models import Quiz
+    from app.schemas import QuizOut
+    from app.serialization import dump_trusted
+
+    result = ScenarioResult("serialization")
+    adapter = TypeAdapter(list[QuizOut])
+    with Session(engine) as session:
+        rows = session.exec(select(Quiz).options(selectinload(Quiz.questions))).all()
+
+        paths: dict[str, Callable[[], bytes]] = {
+            # What the routes did before: validate, dump to Python, encode with stdlib json.
+            "validate_stdlib_json": lambda: json.dumps(
+                adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+            ).encode(),
+            "validate_pydantic_json": lambda: adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+            "trusted_orjson": lambda: dump_trusted(QuizOut, rows),
+        }
+        repeats = max(5, ctx.requests // 10)
+        timings: dict[str, list[float]] = {name: [] for name in paths}
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for name, encode in paths.items():
+                begin = time.perf_counter()
+                payload = encode()
+                timings[name].append((time.perf_counter() - begin) * 1000)
+        result.duration_s = time.perf_counter() - started
+
+    medians = {name: round(sorted(values)[len(values) // 2], 3) for name, values in timings.items()}
+    result.latencies_ms = timings["trusted_orjson"]
+    result.extra.update(
+        {
+            "rows": len(rows),
+            "payload_bytes": len(payload),
+            "median_ms_by_path": medians,
+            "speedup_vs_stdlib": round(medians["validate_stdlib_json"] / max(medians["trusted_orjson"], 1e-6), 2),
+        }
+    )
+    return result
+
+
+async def item_analysis(ctx: BenchContext) -> ScenarioResult:
+    """Item-analysis endpoint cold (after a new attempt) and warm, plus ``analyze`` on a synthetic 50k x 40 matrix."""
+    import numpy as np
+
+    from app.item_analysis import ResponseMatrix, analyze
+
+    result = ScenarioResult("item_analysis")
+    headers = ctx.auth(ctx.data.teacher_ids[0], Role.teacher)
+    quizzes = [(class_id, quiz_id) for class_id, ids in ctx.data.quiz_ids_by_class.items() for quiz_id in ids]
+    cold_ms: list[float] = []
+    async with open_client(ctx.target) as client:
+        for class_id, quiz_id in quizzes[: max(1, ctx.requests // 20)]:
+            student_id = ctx.data.students_by_class[class_id][0]
+            answers = {str(qid): answer for qid, answer in ctx.data.answer_keys[quiz_id].items()}
+            await client.post(f"{API}/quizzes/{quiz_id}/attempts", json={"answers": answers}, headers=ctx.auth(student_id, Role.student))
+            begin = time.perf_counter()
+            resp = await client.get(f"{API}/quizzes/{quiz_id}/item-analysis", headers=headers)
+            cold_ms.append((time.perf_counter() - begin) * 1000)
+            resp.raise_for_status()
+
+        def call(quiz_id: int):
+            return lambda: client.get(f"{API}/quizzes/{quiz_id}/item-analysis", headers=headers)
+
+        calls = [call(ctx.rng.choice(quizzes)[1]) for _ in range(ctx.requests)]
+        await run_concurrently(result, calls, ctx.concurrency)
+
+    rng = np.random.default_rng(ctx.rng.randrange(2**32))
+    attempts, questions = 50_000, 40
+    ability = rng.normal(size=(attempts, 1))
+    difficulty = rng.normal(size=questions)
+    correct = (rng.random((attempts, questions)) < 1 / (1 + np.exp(difficulty - ability))).astype(np.uint8)
+    choices = np.where(correct == 1, 0, rng.integers(1, 4, size=(attempts, questions))).astype(np.int16)
+    matrix = ResponseMatrix(
+        np.arange(questions), [f"topic-{i % 5}" for i in range(questions)], [["a", "b", "c", "d"]] * questions, ["a"] * questions, correct, choices
+    )
+    begin = time.perf_counter()
+    analyze(matrix)
+    result.extra.update(
+        {
+            "cold_p95_ms": round(_p95(cold_ms), 3),
+            "synthetic_shape": [attempts, questions],
+            "synthetic_analyze_ms": round((time.perf_counter() - begin) * 1000, 3),
+        }
+    )
+    return result
+
+
+async def adaptive_cohort(ctx: BenchContext) -> ScenarioResult:
+    """Personalised quizzes for the largest class: one batch request vs. one request per student."""
+    result = ScenarioResult("adaptive_cohort")
+    headers = ctx.auth(ctx.data.teacher_ids[0], Role.teacher)
+    class_id, students = max(ctx.data.students_by_class.items(), key=lambda item: len(item[1]))
+    body = {"class_id": class_id, "subject": "Adaptive", "num_questions": 10}
+    async with open_client(ctx.target) as client:
+        begin = time.perf_counter()
+        resp = await client.post(f"{API}/quizzes/adaptive", json=body, headers=headers, timeout=300)
+        batch_s = time.perf_counter() - begin
+        resp.raise_for_status()
+        result.latencies_ms.append(batch_s * 1000)
+
+        sample = students[: min(len(students), ctx.requests)]
+        begin = time.perf_counter()
+        for student_id in sample:
+            resp = await client.post(f"{API}/quizzes/adaptive", json={**body, "student_ids": [student_id]}, headers=headers)
+            result.errors += resp.status_code != 200
+        per_student_s = time.perf_counter() - begin
+    result.duration_s = batch_s
+    batch_rate = len(students) / batch_s
+    sequential_rate = len(sample) / per_student_s if sample else 0.0
+    result.extra.update(
+        {
+            "students": len(students),
+            "batch_quizzes_per_s": round(batch_rate, 1),
+            "sequential_quizzes_per_s": round(sequential_rate, 1),
+            "batch_speedup": _ratio(batch_rate, sequential_rate),
+        }
+    )
+    return result
+
+
+async def syllabus_progress(ctx: BenchContext) -> ScenarioResult:
+    """Admin dashboard reading the progress rollups while teachers tick items off; baseline pulls every item."""
+    result = ScenarioResult("syllabus_progress")
+    admin = ctx.auth(ctx.admin_id, Role.admin)
+    teacher = ctx.auth(ctx.data.teacher_ids[0], Role.teacher)
+    async with open_client(ctx.target) as client:
+        items = (await client.get(f"{API}/syllabus/", headers=admin)).json()
+        baseline_ms: list[float] = []
+        for _ in range(max(1, ctx.requests // 20)):
+            begin = time.perf_counter()
+            # Bypass the catalog cache so each baseline read really loads every item.
+            await client.post(f"{API}/syllabus/", json={"class_id": "bench", "subject": "Bench", "topic": "cache-buster"}, headers=teacher)
+            resp = await client.get(f"{API}/syllabus/", headers=admin)
+            baseline_ms.append((time.perf_counter() - begin) * 1000)
+
+        def read():
+            return client.get(f"{API}/syllabus/progress", headers=admin)
+
+        def complete(item_id: int):
+            return lambda: client.patch(f"{API}/syllabus/{item_id}", json={"status": ctx.rng.choice(["completed", "pending"])}, headers=teacher)
+
+        calls = [read if n % 4 else complete(ctx.rng.choice(items)["id"]) for n in range(ctx.requests)]
+        await run_concurrently(result, calls, ctx.concurrency)
+        rollups = await client.get(f"{API}/syllabus/progress", headers=admin)
+    result.extra.update(
+        {
+            "items": len(items),
+            "rollup_rows": len(rollups.json()),
+            "rollup_bytes": len(rollups.content),
+            "all_items_bytes": len(resp.content),
+            "all_items_p95_ms": round(_p95(baseline_ms), 3),
+        }
+    )
+    return result
+
+
+async def admission_control(ctx: BenchContext) -> ScenarioResult:
+    """Overload with AI chat, list reads and quiz submissions under a tight in-flight cap; count who gets shed."""
+    from app.admission import admission
+
+    result = ScenarioResult("admission_control")
+    if isinstance(ctx.target, RemoteTarget):
+        # Limits are toggled on this process's controller; a remote server uses its own settings.
+        result.extra["skipped"] = "needs --target inprocess or uvicorn"
+        return result
+
+    outcomes: dict[str, dict[str, int]] = {}
+    students = [(class_id, student_id) for class_id, ids in ctx.data.students_by_class.items() for student_id in ids]
+    previous = (admission.enabled, admission.max_in_flight)
+    admission.enabled, admission.max_in_flight = True, max(2, ctx.concurrency)
+    try:
+        async with open_client(ctx.target) as client:
+
+            def call(kind: str, class_id: str, student_id: int):
+                headers = ctx.auth(student_id, Role.student)
+
+                async def send() -> httpx.Response:
+                    if kind == "quiz_attempt":
+                        quiz_id = ctx.rng.choice(ctx.data.quiz_ids_by_class[class_id])
+                        answers = {str(qid): answer for qid, answer in ctx.data.answer_keys[quiz_id].items()}
+                        return await client.post(f"{API}/quizzes/{quiz_id}/attempts", json={"answers": answers}, headers=headers)
+                    if kind == "chat_ai":
+                        return await client.post(f"{API}/chat/ai", json={"message": "Explain this topic"}, headers=headers)
+                    return await client.get(f"{API}/chat/threads", headers=headers)
+
+                async def go() -> httpx.Response:
+                    # Clients honour rejections by retrying; Retry-After is scaled down to keep the run short.
+                    counts = outcomes.setdefault(kind, {"admitted": 0, "rate_limited": 0, "shed": 0, "gave_up": 0})
+                    for _ in range(ADMISSION_RETRIES):
+                        resp = await send()
+                        if resp.status_code not in (429, 503):
+                            counts["admitted"] += 1
+                            return resp
+                        counts["rate_limited" if resp.status_code == 429 else "shed"] += 1
+                        await asyncio.sleep(ADMISSION_RETRY_S)
+                    counts["gave_up"] += 1
+                    return resp
+
+                return go
+
+            kinds = ["quiz_attempt", "chat_ai", "chat_threads"]
+            calls = [call(kinds[n % 3], *ctx.rng.choice(students)) for n in range(ctx.requests * 3)]
+            await run_concurrently(result, calls, ctx.concurrency * 2)
+    finally:
+        admission.enabled, admission.max_in_flight = previous
+
+    # Requests still rejected after every retry are the limiter working, not failures.
+    result.errors -= sum(counts["gave_up"] for counts in outcomes.values())
+    result.extra.update(
+        {
+            "outcomes": outcomes,
+            "rejections_per_request": {
+                kind: _ratio(counts["rate_limited"] + counts["shed"], counts["admitted"] + counts["gave_up"])
+                for kind, counts in outcomes.items()
+            },
+            "peak_in_flight": admission.metrics.peak_in_flight,
+        }
+    )
+    return result
+
+
+async def bulk_review(ctx: BenchContext) -> ScenarioResult:
+    """Clear a backlog of profile change requests: one review call per request vs. keyset pages + bulk-review."""
+    result = ScenarioResult("bulk_review")
+    admin = ctx.auth(ctx.admin_id, Role.admin)
+    async with open_client(ctx.target) as client:
+
+        def submit(student_id: int, n: int):
+            changes = {"phone": f"+1-555-{n:04d}"} if n % 2 else {"branch": ctx.rng.choice(["CSE", "ECE", "ME"])}
+            return lambda: client.post(f"{API}/change-requests/", json={"requested_changes": changes}, headers=ctx.auth(student_id, Role.student))
+
+        submissions = [submit(ctx.rng.choice(ctx.data.student_ids), n) for n in range(ctx.requests * 2)]
+        await run_concurrently(ScenarioResult("submit"), submissions, ctx.concurrency)
+
+        first = (await client.get(f"{API}/change-requests/pending?limit={ctx.requests}", headers=admin)).json()
+        single_ids = [item["id"] for item in first["items"]]
+
+        def review(request_id: int):
+            return lambda: client.post(f"{API}/change-requests/{request_id}/review", json={"status": "approved"}, headers=admin)
+
+        begin = time.perf_counter()
+        await run_concurrently(result, [review(request_id) for request_id in single_ids], ctx.concurrency)
+        single_s = time.perf_counter() - begin
+
+        bulk_count = 0
+        pages = 0
+        after_id = 0
+        begin = time.perf_counter()
+        while True:
+            page = (await client.get(f"{API}/change-requests/pending?limit=500&after_id={after_id}", headers=admin)).json()
+            decisions = [{"id": item["id"], "status": "approved" if item["id"] % 5 else "denied"} for item in page["items"]]
+            if decisions:
+                resp = await client.post(f"{API}/change-requests/bulk-review", json={"decisions": decisions}, headers=admin)
+                resp.raise_for_status()
+                body = resp.json()
+                bulk_count += len(body["approved"]) + len(body["denied"])
+                result.errors += len(body["failed"])
+                pages += 1
+            if page["next_after_id"] is None:
+                break
+            after_id = page["next_after_id"]
+        bulk_s = time.perf_counter() - begin
+
+    single_rate = len(single_ids) / single_s if single_s else 0.0
+    bulk_rate = bulk_count / bulk_s if bulk_s else 0.0
+    result.extra.update(
+        {
+            "single_reviews": len(single_ids),
+            "single_reviews_per_s": round(single_rate, 1),
+            "bulk_reviews": bulk_count,
+            "bulk_pages": pages,
+            "bulk_reviews_per_s": round(bulk_rate, 1),
+            "bulk_speedup": _ratio(bulk_rate, single_rate),
+        }
+    )
+    return result
+
+
+async def archival(ctx: BenchContext) -> ScenarioResult:
+    """Archive the older half of chat history and quiz responses, then page threads through hot and cold rows."""
+    from sqlalchemy import func
+    from sqlmodel import Session, select
+
+    from app.archive import archive_chat_messages, archive_quiz_responses
+    from app.db import engine
+    from app.models import ChatMessage, QuizAttempt
+
+    result = ScenarioResult("archival")
+    if isinstance(ctx.target, RemoteTarget):
+        # Archive files are written by this process; a remote server may not see ARCHIVE_DIR.
+        result.extra["skipped"] = "needs --target inprocess or uvicorn"
+        return result
+
+    admin = ctx.auth(ctx.admin_id, Role.admin)
+    threads = [tid for tids in ctx.data.thread_ids_by_class.values() for tid in tids]
+    async with open_client(ctx.target) as client:
+
+        async def history(include_archived: bool) -> tuple[list[float], int]:
+            timings: list[float] = []
+            rows = 0
+            for thread_id in threads:
+                before_id = None
+                while True:
+                    query = f"limit=100&include_archived={str(include_archived).lower()}"
+                    if before_id:
+                        query += f"&before_id={before_id}"
+                    begin = time.perf_counter()
+                    resp = await client.get(f"{API}/chat/threads/{thread_id}/messages?{query}", headers=admin)
+                    timings.append((time.perf_counter() - begin) * 1000)
+                    page = resp.json()
+                    if resp.status_code != 200 or not page:
+                        break
+                    rows += len(page)
+                    before_id = page[-1]["id"]
+            return timings, rows
+
+        before_ms, before_rows = await history(False)
+
+        with Session(engine) as session:
+            message_times = session.exec(select(ChatMessage.created_at).order_by(ChatMessage.created_at)).all()
+            submitted = session.exec(
+                select(QuizAttempt.submitted_at).where(QuizAttempt.submitted_at.is_not(None)).order_by(QuizAttempt.submitted_at)
+            ).all()
+            started = time.perf_counter()
+            moved_messages = archive_chat_messages(session, message_times[len(message_times) // 2]) if message_times else 0
+            moved_responses = archive_quiz_responses(session, submitted[len(submitted) // 2]) if submitted else 0
+            archive_s = time.perf_counter() - started
+            hot_messages = session.exec(select(func.count(ChatMessage.id))).one()
+
+        hot_ms, hot_rows = await history(False)
+        started = time.perf_counter()
+        full_ms, full_rows = await history(True)
+        result.duration_s = time.perf_counter() - started
+        result.latencies_ms = full_ms
+
+    result.errors += abs(full_rows - before_rows)
+    result.extra.update(
+        {
+            "messages_archived": moved_messages,
+            "responses_archived": moved_responses,
+            "archive_rows_per_s": round((moved_messages + moved_responses) / archive_s, 1) if archive_s else None,
+            "hot_messages_left": hot_messages,
+            "history_rows": {"before": before_rows, "hot_only": hot_rows, "with_archive": full_rows},
+            "page_p95_ms": {"before": _p95(before_ms), "hot_only": _p95(hot_ms), "with_archive": _p95(full_ms)},
+        }
+    )
+    return result
+
+
+async def ai_batching(ctx: BenchContext) -> ScenarioResult:
+    """Concurrent chat and quiz prompts through /chat/ai to a local stand-in model, one prompt per call vs micro-batched."""
+    from app.ai import LocalProvider, MicroBatcher, ai_router
+
+    from .ai_standin import build_app
+
+    result = ScenarioResult("ai_batching")
+    if isinstance(ctx.target, RemoteTarget):
+        # Providers are swapped on this process's router; a remote server keeps its own.
+        result.extra["skipped"] = "needs --target inprocess or uvicorn"
+        return result
+
+    standin_app = build_app()
+    standin = UvicornTarget(standin_app)
+    previous = (dict(ai_router.batchers), dict(ai_router.routes))
+    runs: dict[str, dict] = {}
+    students = ctx.data.student_ids
+    try:
+        async with open_client(ctx.target) as client:
+
+            def ask(n: int):
+                task = "quiz" if n % 4 == 0 else "chat"
+                body = {"message": f"Explain topic {n % 17} in two sentences", "syllabus_context": ["Physics"], "task": task}
+                headers = ctx.auth(students[n % len(students)], Role.student)
+                return lambda: client.post(f"{API}/chat/ai", json=body, headers=headers)
+
+            for label, max_batch in (("unbatched", 1), ("batched", settings.ai_max_batch)):
+                provider = LocalProvider(f"{standin.base_url}/v1", "bench-standin", max_batch=max_batch)
+                ai_router.batchers["local"] = MicroBatcher(provider, settings.ai_batch_window_ms, max_batch, settings.ai_max_concurrent_batches)
+                ai_router.routes.update(chat="local", quiz="local")
+                calls_before = standin_app.state.stats["calls"]
+                run = ScenarioResult(label)
+                await run_concurrently(run, [ask(n) for n in range(ctx.requests)], ctx.concurrency)
+                summary = run.summary()
+                runs[label] = {
+                    "throughput_rps": summary["throughput_rps"],
+                    "p95_ms": summary.get("latency_ms", {}).get("p95"),
+                    "errors": run.errors,
+                    "model_calls": standin_app.state.stats["calls"] - calls_before,
+                    "mean_batch_size": ai_router.batchers["local"].snapshot()["mean_batch_size"],
+                }
+                if label == "batched":
+                    result.latencies_ms, result.duration_s, result.errors = run.latencies_ms, run.duration_s, run.errors
+                else:
+                    result.errors += run.errors
+    finally:
+        ai_router.batchers.clear()
+        ai_router.batchers.update(previous[0])
+        ai_router.routes.clear()
+        ai_router.routes.update(previous[1])
+        standin.close()
+
+    result.extra.update(
+        {
+            "runs": runs,
+            "batching_speedup": _ratio(runs["batched"]["throughput_rps"], runs["unbatched"]["throughput_rps"]),
+        }
+    )
+    return result
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "login_burst": login_burst,
+    "submit_storm": submit_storm,
+    "weak_area_reads": weak_area_reads,
+    "list_endpoints": list_endpoints,
+    "catalog_polling": catalog_polling,
+    "read_during_write_storm": read_during_write_storm,
+    "gradebook_export": gradebook_export,
+    "websockets": websockets_fanout,
+    "serialization": serialization,
+    "item_analysis": item_analysis,
+    "adaptive_cohort": adaptive_cohort,
+    "syllabus_progress": syllabus_progress,
+    "admission_control": admission_control,
+    "bulk_review": bulk_review,
+    "archival": archival,
+    "ai_batching": ai_batching,
+}
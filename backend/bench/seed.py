@@ -0,0 +1,312 @@
+"""Synthetic data generator for benchmark runs.
+
+Rows are written with Core ``executemany`` inserts against the regular SQLModel
+tables so that the volumes match what the API would produce, without paying
+ORM or bcrypt costs per row. All randomness flows from a single seed.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+
+from app.models import (
+    ChatMessage,
+    ChatScope,
+    ChatThread,
+    Quiz,
+    QuizAttempt,
+    QuizQuestion,
+    QuizResponse,
+    Role,
+    SyllabusItem,
+    User,
+)
+from app.progress import rebuild_progress
+from app.quiz import generate_questions
+from app.security import hash_password
+
+BENCH_PASSWORD = "bench-pass"
+BENCH_EMAIL_DOMAIN = "bench.example.org"
+
+SUBJECTS: dict[str, list[str]] = {
+    "Mathematics": ["Fractions", "Linear equations", "Quadratics", "Probability", "Geometry", "Trigonometry"],
+    "Physics": ["Kinematics", "Newton's laws", "Work and energy", "Optics", "Electricity", "Magnetism"],
+    "Chemistry": ["Atomic structure", "Periodic table", "Chemical bonding", "Acids and bases", "Stoichiometry"],
+    "Biology": ["Cell structure", "Genetics", "Photosynthesis", "Human digestion", "Ecology"],
+    "English": ["Grammar", "Comprehension", "Essay writing", "Poetry", "Vocabulary"],
+}
+
+
+@dataclass
+class SeedConfig:
+    classes: int = 4
+    students_per_class: int = 30
+    teachers: int = 6
+    syllabus_items_per_subject: int = 5
+    quizzes_per_class: int = 3
+    questions_per_quiz: int = 10
+    attempt_rate: float = 0.8
+    threads_per_class: int = 2
+    messages_per_thread: int = 50
+    seed: int = 1234
+
+
+SCALES: dict[str, SeedConfig] = {
+    "tiny": SeedConfig(classes=2, students_per_class=10, teachers=2, quizzes_per_class=2, messages_per_thread=10),
+    "small": SeedConfig(),
+    "medium": SeedConfig(classes=12, students_per_class=40, teachers=15, quizzes_per_class=6, messages_per_thread=200),
+    "large": SeedConfig(
+        classes=40, students_per_class=50, teachers=40, quizzes_per_class=10, questions_per_quiz=20, messages_per_thread=500
+    ),
+}
+
+
+@dataclass
+class SeedResult:
+    class_ids: list[str] = field(default_factory=list)
+    teacher_ids: list[int] = field(default_factory=list)
+    student_ids: list[int] = field(default_factory=list)
+    students_by_class: dict[str, list[int]] = field(default_factory=dict)
+    quiz_ids_by_class: dict[str, list[int]] = field(default_factory=dict)
+    answer_keys: dict[int, dict[int, str]] = field(default_factory=dict)
+    thread_ids_by_class: dict[str, list[int]] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def email_for(self, user_id: int) -> str:
+        return f"user{user_id}@{BENCH_EMAIL_DOMAIN}"
+
+
+def _next_id(session: Session, model) -> int:
+    return (session.exec(select(func.max(model.id))).one() or 0) + 1
+
+
+def _bulk_insert(session: Session, model, rows: list[dict], chunk: int = 5000) -> None:
+    for start in range(0, len(rows), chunk):
+        session.execute(insert(model.__table__), rows[start : start + chunk])
+
+
+def seed_database(session: Session, config: SeedConfig) -> SeedResult:
+    rng = random.Random(config.seed)
+    # quiz.generate_questions draws from the module-level RNG
+    random.seed(config.seed)
+    now = datetime.utcnow()
+    result = SeedResult()
+    password_hash = hash_password(BENCH_PASSWORD)
+    subjects = list(SUBJECTS)
+
+    # Users
+    user_id = _next_id(session, User)
+    user_rows: list[dict] = []
+    result.class_ids = _class_names(config.classes)
+    for i in range(config.teachers):
+        taught = rng.sample(result.class_ids, k=min(len(result.class_ids), rng.randint(1, 3)))
+        user_rows.append(
+            _user_row(user_id, f"Teacher {i}", Role.teacher, password_hash, now, classes=taught, subjects=[subjects[i % len(subjects)]])
+        )
+        result.teacher_ids.append(user_id)
+        user_id += 1
+    for class_id in result.class_ids:
+        members: list[int] = []
+        for n in range(config.students_per_class):
+            user_rows.append(
+                _user_row(user_id, f"Student {class_id}/{n}", Role.student, password_hash, now, classes=[class_id], roll_no=f"{class_id}-{n:03d}")
+            )
+            members.append(user_id)
+            user_id += 1
+        result.students_by_class[class_id] = members
+        result.student_ids.extend(members)
+    _bulk_insert(session, User, user_rows)
+
+    # Syllabus
+    item_id = _next_id(session, SyllabusItem)
+    item_rows: list[dict] = []
+    for class_id in result.class_ids:
+        for subject, topics in SUBJECTS.items():
+            for topic in topics[: config.syllabus_items_per_subject]:
+                due = now + timedelta(days=rng.randint(-30, 60))
+                completed = due < now and rng.random() < 0.7
+                item_rows.append(
+                    {
+                        "id": item_id,
+                        "class_id": class_id,
+                        "subject": subject,
+                        "topic": topic,
+                        "status": "completed" if completed else "pending",
+                        "due_date": due,
+                        "completed_at": due if completed else None,
+                        "teacher_id": rng.choice(result.teacher_ids) if result.teacher_ids else None,
+                        "created_at": now - timedelta(days=90),
+                    }
+                )
+                item_id += 1
+    _bulk_insert(session, SyllabusItem, item_rows)
+    rebuild_progress(session)
+
+    # Quizzes, questions, attempts, responses
+    quiz_id = _next_id(session, Quiz)
+    question_id = _next_id(session, QuizQuestion)
+    attempt_id = _next_id(session, QuizAttempt)
+    response_id = _next_id(session, QuizResponse)
+    quiz_rows: list[dict] = []
+    question_rows: list[dict] = []
+    attempt_rows: list[dict] = []
+    response_rows: list[dict] = []
+    ability = {sid: rng.uniform(0.3, 0.95) for sid in result.student_ids}
+    for class_id in result.class_ids:
+        result.quiz_ids_by_class[class_id] = []
+        for _ in range(config.quizzes_per_class):
+            subject = rng.choice(subjects)
+            topics = rng.sample(SUBJECTS[subject], k=min(3, len(SUBJECTS[subject])))
+            created = now - timedelta(days=rng.randint(1, 60))
+            quiz_rows.append(
+                {"id": quiz_id, "class_id": class_id, "subject": subject, "generated_from": {"topics": topics}, "created_at": created}
+            )
+            key: dict[int, str] = {}
+            options_by_question: dict[int, list[str]] = {}
+            questions = generate_questions(topics, config.questions_per_quiz)
+            for q in questions:
+                question_rows.append(
+                    {
+                        "id": question_id,
+                        "quiz_id": quiz_id,
+                        "prompt": q.prompt,
+                        "options": q.options,
+                        "answer": q.answer,
+                        "explanation": q.explanation,
+                        "topic": q.topic,
+                    }
+                )
+                key[question_id] = q.answer
+                options_by_question[question_id] = q.options
+                question_id += 1
+            result.answer_keys[quiz_id] = key
+            result.quiz_ids_by_class[class_id].append(quiz_id)
+
+            for student_id in result.students_by_class[class_id]:
+                if rng.random() > config.attempt_rate:
+                    continue
+                started = created + timedelta(hours=rng.randint(1, 72))
+                correct_count = 0
+                for qid, answer in key.items():
+                    options = options_by_question[qid]
+                    correct = rng.random() < ability[student_id]
+                    choice = answer if correct else rng.choice([o for o in options if o != answer] or [""])
+                    correct_count += correct
+                    response_rows.append(
+                        {
+                            "id": response_id,
+                            "attempt_id": attempt_id,
+                            "question_id": qid,
+                            "choice": choice,
+                            "correct": correct,
+                            "feedback": None,
+                        }
+                    )
+                    response_id += 1
+                attempt_rows.append(
+                    {
+                        "id": attempt_id,
+                        "quiz_id": quiz_id,
+                        "student_id": student_id,
+                        "started_at": started,
+                        "submitted_at": started + timedelta(minutes=rng.randint(5, 40)),
+                        "score": correct_count / max(len(key), 1),
+                    }
+                )
+                attempt_id += 1
+            quiz_id += 1
+    _bulk_insert(session, Quiz, quiz_rows)
+    _bulk_insert(session, QuizQuestion, question_rows)
+    _bulk_insert(session, QuizAttempt, attempt_rows)
+    _bulk_insert(session, QuizResponse, response_rows)
+
+    # Chat
+    thread_id = _next_id(session, ChatThread)
+    message_id = _next_id(session, ChatMessage)
+    thread_rows: list[dict] = []
+    message_rows: list[dict] = []
+    for class_id in result.class_ids:
+        result.thread_ids_by_class[class_id] = []
+        members = result.students_by_class[class_id]
+        for t in range(config.threads_per_class):
+            owner = rng.choice(result.teacher_ids) if result.teacher_ids else members[0]
+            thread_rows.append(
+                {
+                    "id": thread_id,
+                    "scope": ChatScope.class_channel,
+                    "subject": subjects[t % len(subjects)],
+                    "owner_id": owner,
+                    "audience": {"class_id": class_id},
+                    "created_at": now - timedelta(days=60),
+                }
+            )
+            posted = now - timedelta(days=60)
+            for _ in range(config.messages_per_thread):
+                sender = rng.choice(members + [owner])
+                posted += timedelta(minutes=rng.randint(1, 120))
+                message_rows.append(
+                    {
+                        "id": message_id,
+                        "thread_id": thread_id,
+                        "sender_id": sender,
+                        "role": Role.teacher if sender == owner else Role.student,
+                        "body": _chat_body(rng),
+                        "created_at": posted,
+                    }
+                )
+                message_id += 1
+            result.thread_ids_by_class[class_id].append(thread_id)
+            thread_id += 1
+    _bulk_insert(session, ChatThread, thread_rows)
+    _bulk_insert(session, ChatMessage, message_rows)
+    session.commit()
+
+    result.counts = {
+        "users": len(user_rows),
+        "syllabus_items": len(item_rows),
+        "quizzes": len(quiz_rows),
+        "questions": len(question_rows),
+        "attempts": len(attempt_rows),
+        "responses": len(response_rows),
+        "threads": len(thread_rows),
+        "messages": len(message_rows),
+    }
+    return result
+
+
+def _class_names(count: int) -> list[str]:
+    grades = ["VI", "VII", "VIII", "IX", "X", "XI", "XII"]
+    sections = "ABCDEFGH"
+    names = [f"{grade}-{section}" for section in sections for grade in grades]
+    return [names[i % len(names)] + (f"{i // len(names)}" if i >= len(names) else "") for i in range(count)]
+
+
+def _user_row(user_id: int, name: str, role: Role, password_hash: str, now: datetime, **extra) -> dict:
+    row = {
+        "id": user_id,
+        "name": name,
+        "email": f"user{user_id}@{BENCH_EMAIL_DOMAIN}",
+        "phone": None,
+        "role": role,
+        "department": "Science",
+        "branch": None,
+        "classes": None,
+        "subjects": None,
+        "roll_no": None,
+        "active": True,
+        "password_hash": password_hash,
+        "created_at": now,
+        "updated_at": now,
+    }
+    row.update(extra)
+    return row
+
+
+_CHAT_WORDS = "please explain why the answer to question is different from what we did in class yesterday thanks".split()
+
+
+def _chat_body(rng: random.Random) -> str:
+    return " ".join(rng.choice(_CHAT_WORDS) for _ in range(rng.randint(4, 30))).capitalize() + "?"
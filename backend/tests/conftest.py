@@ -0,0 +1,52 @@
+import itertools
+import os
+import tempfile
+
+# Settings and engines are module globals, so point them at a scratch database before ``app`` is imported.
+_scratch = tempfile.mkdtemp(prefix="lls-tests-")
+os.environ.update(
+    DB_URL=f"sqlite:///{os.path.join(_scratch, 'test.db')}",
+    DB_READ_URL="",
+    JWT_SECRET="test-secret",
+    RATE_LIMIT_ENABLED="false",
+    JOB_WORKERS="0",
+    ARCHIVE_DIR=os.path.join(_scratch, "archive"),
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Role, User  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client):
+    def make(role: Role = Role.student, **fields) -> User:
+        with Session(engine) as session:
+            user = User(name="Test User", email=f"user{next(_emails)}@example.com", password_hash="-", role=role, **fields)
+            session.add(user)
+            session.commit()
+            session.refresh(user)
+            return user
+
+    return make
+
+
+@pytest.fixture
+def auth_headers():
+    def headers(user: User) -> dict[str, str]:
+        return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id), 'role': user.role.value})}"}
+
+    return headers
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.db import make_engine
+
+READ_SECONDS = 0.6
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'storm.db'}"
+    engine = make_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, body TEXT NOT NULL)"))
+        conn.execute(text("INSERT INTO item (body) VALUES (:body)"), [{"body": f"row {n}"} for n in range(500)])
+    engine.dispose()
+    return url
+
+
+def test_primary_runs_in_wal_mode(db_url):
+    engine = make_engine(db_url)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+
+def test_read_engine_is_query_only(db_url):
+    engine = make_engine(db_url, read_only=True)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+        with pytest.raises(OperationalError, match="readonly"):
+            conn.execute(text("INSERT INTO item (body) VALUES ('nope')"))
+
+
+def _read_for(engine, seconds: float, errors: list[BaseException]) -> int:
+    reads = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT count(*), max(id) FROM item")).one()
+        except OperationalError as exc:
+            errors.append(exc)
+        reads += 1
+    return reads
+
+
+def test_reads_keep_going_during_a_write_storm(db_url):
+    writer = make_engine(db_url)
+    reader = make_engine(db_url, read_only=True)
+    errors: list[BaseException] = []
+    alone = _read_for(reader, READ_SECONDS, errors)
+
+    stop = threading.Event()
+    written = 0
+
+    def storm() -> None:
+        nonlocal written
+        while not stop.is_set():
+            # Hold the write lock across a pause, as a slow request transaction would.
+            with writer.begin() as conn:
+                conn.execute(text("INSERT INTO item (body) VALUES (:body)"), [{"body": "storm"}] * 50)
+                time.sleep(0.005)
+            written += 50
+
+    writers = [threading.Thread(target=storm) for _ in range(2)]
+    for thread in writers:
+        thread.start()
+    try:
+        during = _read_for(reader, READ_SECONDS, errors)
+    finally:
+        stop.set()
+        for thread in writers:
+            thread.join()
+
+    assert not errors, errors[0]
+    assert written > 0
+    # Reads share the interpreter with the writers, so some slowdown is expected; stalling on locks is not.
+    assert during >= alone * 0.25, (alone, during)
@@ -0,0 +1,10 @@
+from app.models import Role
+
+
+def test_gradebook_filename_is_sanitised(client, make_user, auth_headers):
+    headers = auth_headers(make_user(Role.teacher))
+
+    resp = client.get("/api/exports/gradebook", params={"class_id": 'IX-A"; x=\r\n1'}, headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-disposition"] == 'attachment; filename="gradebook-IX-A___x___1.csv"'
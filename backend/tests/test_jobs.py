@@ -0,0 +1,9 @@
+from app.models import Role
+
+
+def test_list_jobs_limit_is_bounded(client, make_user, auth_headers):
+    headers = auth_headers(make_user(Role.admin))
+
+    assert client.get("/api/jobs/?limit=-1", headers=headers).status_code == 422
+    assert client.get("/api/jobs/?limit=501", headers=headers).status_code == 422
+    assert client.get("/api/jobs/?limit=1", headers=headers).status_code == 200
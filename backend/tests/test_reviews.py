@@ -0,0 +1,123 @@
+from sqlmodel import Session
+
+from app import reviews
+from app.db import engine
+from app.models import ChangeRequest, ChangeStatus, Role, User
+
+
+def submit(client, auth_headers, user, changes) -> int:
+    resp = client.post("/api/change-requests/", json={"requested_changes": changes}, headers=auth_headers(user))
+    assert resp.status_code == 200
+    return resp.json()["id"]
+
+
+def bulk_review(client, auth_headers, admin, decisions) -> dict:
+    resp = client.post("/api/change-requests/bulk-review", json={"decisions": decisions}, headers=auth_headers(admin))
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def load(model, id_):
+    with Session(engine) as session:
+        return session.get(model, id_)
+
+
+def test_approval_applies_changes_to_user(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user(phone="000")
+    request_id = submit(client, auth_headers, student, {"phone": "555", "branch": "CSE"})
+
+    result = bulk_review(client, auth_headers, admin, [{"id": request_id, "status": "approved", "reviewer_note": "ok"}])
+
+    assert result == {"approved": [request_id], "denied": [], "failed": []}
+    user = load(User, student.id)
+    assert (user.phone, user.branch) == ("555", "CSE")
+    request = load(ChangeRequest, request_id)
+    assert (request.status, request.reviewer_id, request.reviewer_note) == (ChangeStatus.approved, admin.id, "ok")
+
+
+def test_invalid_and_unknown_fields_are_reported_and_left_pending(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user()
+    unknown = submit(client, auth_headers, student, {"role": "admin"})
+    invalid = submit(client, auth_headers, student, {"classes": "not-a-list"})
+
+    result = bulk_review(client, auth_headers, admin, [{"id": unknown, "status": "approved"}, {"id": invalid, "status": "approved"}])
+
+    assert result["approved"] == []
+    failed = {entry["id"]: entry for entry in result["failed"]}
+    assert failed[unknown]["reason"] == "invalid" and "role" in failed[unknown]["error"]
+    assert failed[invalid]["reason"] == "invalid" and "classes" in failed[invalid]["error"]
+    assert load(ChangeRequest, unknown).status == ChangeStatus.pending
+    assert load(ChangeRequest, invalid).status == ChangeStatus.pending
+    assert load(User, student.id).role == Role.student
+
+
+def test_duplicate_id_in_one_batch(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user()
+    request_id = submit(client, auth_headers, student, {"roll_no": "R1"})
+
+    result = bulk_review(client, auth_headers, admin, [{"id": request_id, "status": "approved"}, {"id": request_id, "status": "denied"}])
+
+    assert result["approved"] == [request_id]
+    assert result["failed"] == [{"id": request_id, "reason": "duplicate", "error": "Request appears more than once"}]
+    assert load(ChangeRequest, request_id).status == ChangeStatus.approved
+
+
+def test_re_review_conflicts(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user()
+    request_id = submit(client, auth_headers, student, {"name": "Renamed"})
+    url = f"/api/change-requests/{request_id}/review"
+
+    assert client.post(url, json={"status": "denied"}, headers=auth_headers(admin)).status_code == 200
+    again = client.post(url, json={"status": "approved"}, headers=auth_headers(admin))
+
+    assert again.status_code == 409
+    assert load(ChangeRequest, request_id).status == ChangeStatus.denied
+    assert load(User, student.id).name == "Test User"
+
+
+def test_approvals_for_one_user_merge_in_id_order(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user()
+    first = submit(client, auth_headers, student, {"phone": "111", "department": "Physics"})
+    second = submit(client, auth_headers, student, {"phone": "222"})
+
+    # Decision order doesn't matter: the later request wins where both set a field.
+    result = bulk_review(client, auth_headers, admin, [{"id": second, "status": "approved"}, {"id": first, "status": "approved"}])
+
+    assert sorted(result["approved"]) == [first, second]
+    user = load(User, student.id)
+    assert (user.phone, user.department) == ("222", "Physics")
+
+
+def test_request_decided_elsewhere_is_not_pending(client, make_user, auth_headers):
+    admin, student = make_user(Role.admin), make_user()
+    request_id = submit(client, auth_headers, student, {"phone": "999"})
+    with Session(engine) as session:
+        session.get(ChangeRequest, request_id).status = ChangeStatus.denied
+        session.commit()
+
+    result = bulk_review(client, auth_headers, admin, [{"id": request_id, "status": "approved"}])
+
+    assert result["approved"] == []
+    assert result["failed"][0]["reason"] == "not_pending"
+    assert load(User, student.id).phone != "999"
+
+
+def test_request_decided_concurrently_is_not_applied(client, make_user, auth_headers, monkeypatch):
+    admin, student = make_user(Role.admin), make_user()
+    request_id = submit(client, auth_headers, student, {"phone": "888"})
+    validate = reviews.validate_changes
+
+    def decided_meanwhile(requested):
+        # Another reviewer commits between this review's read and its UPDATE.
+        with Session(engine) as session:
+            session.get(ChangeRequest, request_id).status = ChangeStatus.denied
+            session.commit()
+        return validate(requested)
+
+    monkeypatch.setattr(reviews, "validate_changes", decided_meanwhile)
+    result = bulk_review(client, auth_headers, admin, [{"id": request_id, "status": "approved"}])
+
+    assert result["approved"] == []
+    assert [entry["reason"] for entry in result["failed"]] == ["not_pending"]
+    assert load(ChangeRequest, request_id).status == ChangeStatus.denied
+    assert load(User, student.id).phone != "888"